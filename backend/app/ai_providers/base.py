@@ -4,7 +4,19 @@ from typing import Dict, Any, Optional
 
 class AIProvider(ABC):
     @abstractmethod
-    async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    async def process_query(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        *,
+        question: Optional[str] = None,
+        coalesce: bool = True,
+    ) -> Dict[str, Any]:
+        """
+        ``question`` is the bare user question behind ``query``, when there is one.
+        With ``coalesce=False`` the call never shares an in-flight request, so
+        cancelling the caller cancels the request too.
+        """
         pass
 
     @abstractmethod
@@ -1,12 +1,17 @@
 # backend/app/ai_providers/gemini_provider.py
 import asyncio
 import os
-from typing import Any, Dict, Optional
+import re
+from typing import Any, Dict, List, Optional, Tuple
 
-import google.generativeai as genai
+import httpx
 from dotenv import load_dotenv
+from google import genai
+from google.genai import types
 
 from .base import AIProvider
+from ..cache.cache_manager import CacheManager
+from ..cache.llm_cache import LLMCache
 
 load_dotenv()
 
@@ -31,23 +36,36 @@ Rules:
 4. Apply GROUP BY when aggregating columns.
 """
 
+_SQL_MARKER_RE = re.compile(
+    r"sql query|raw sql|generate a sql|return only the raw sql", re.IGNORECASE
+)
+
 
 class GeminiProvider(AIProvider):
-    def __init__(self) -> None:
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None) -> None:
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             raise ValueError("GEMINI_API_KEY environment variable is not set")
 
-        genai.configure(api_key=api_key)
+        # Reuse the caller's long-lived HTTP client so connections stay warm.
+        http_options = (
+            types.HttpOptions(httpx_async_client=http_client) if http_client else None
+        )
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
 
         analysis_model_id = os.getenv("GEMINI_MODEL", "models/gemini-2.5-flash-lite")
         sql_model_id = os.getenv("GEMINI_SQL_MODEL", analysis_model_id)
 
-        analysis_model_id = self._normalize_model_id(analysis_model_id)
-        sql_model_id = self._normalize_model_id(sql_model_id)
+        self.analysis_model_id = self._normalize_model_id(analysis_model_id)
+        self.sql_model_id = self._normalize_model_id(sql_model_id)
+
+        self.embedding_model_id = self._normalize_model_id(
+            os.getenv("GEMINI_EMBEDDING_MODEL", "models/text-embedding-004")
+        )
+        self.response_cache = LLMCache(CacheManager(max_size=10_000, ttl=24 * 3600), self._embed)
 
-        self.analysis_model = genai.GenerativeModel(analysis_model_id)
-        self.sql_model = genai.GenerativeModel(sql_model_id)
+        # Identical prompts already in flight share one request.
+        self._inflight: Dict[Tuple[str, bool], asyncio.Task] = {}
 
     @staticmethod
     def _normalize_model_id(model_id: str) -> str:
@@ -58,51 +76,109 @@ class GeminiProvider(AIProvider):
             model_id = f"models/{model_id}"
         return model_id
 
-    async def _generate_text(self, prompt: str, *, use_sql_model: bool = False) -> str:
-        model = self.sql_model if use_sql_model else self.analysis_model
-
-        def _generate() -> str:
-            response = model.generate_content(prompt)
-            if getattr(response, "prompt_feedback", None) and response.prompt_feedback.block_reason:
-                raise ValueError(
-                    f"Gemini blocked the prompt: {response.prompt_feedback.block_reason}"
-                )
-
-            if hasattr(response, "text") and response.text:
-                return response.text.strip()
-
-            # Fall back to concatenating parts if text is empty.
-            parts = []
-            for candidate in getattr(response, "candidates", []) or []:
-                content = getattr(candidate, "content", None)
-                content_parts = getattr(content, "parts", None) if content else None
-                if not content_parts:
-                    continue
-                for part in content_parts:
-                    if getattr(part, "text", None):
-                        parts.append(part.text)
-            return "\n".join(parts).strip()
-
-        return await asyncio.to_thread(_generate)
+    async def _generate_text(
+        self, prompt: str, *, use_sql_model: bool = False, coalesce: bool = True
+    ) -> str:
+        if not coalesce:
+            return await self._request_text(prompt, use_sql_model=use_sql_model)
+
+        key = (prompt, use_sql_model)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(
+                self._request_text(prompt, use_sql_model=use_sql_model)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shielded so one caller cancelling doesn't cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Tuple[str, bool], task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def aclose(self) -> None:
+        """Cancel requests still in flight, e.g. at application shutdown."""
+        tasks = list(self._inflight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _request_text(self, prompt: str, *, use_sql_model: bool = False) -> str:
+        model_id = self.sql_model_id if use_sql_model else self.analysis_model_id
+
+        response = await self.client.aio.models.generate_content(
+            model=model_id, contents=prompt
+        )
+        if getattr(response, "prompt_feedback", None) and response.prompt_feedback.block_reason:
+            raise ValueError(
+                f"Gemini blocked the prompt: {response.prompt_feedback.block_reason}"
+            )
+
+        if hasattr(response, "text") and response.text:
+            return response.text.strip()
+
+        # Fall back to concatenating parts if text is empty.
+        parts = []
+        for candidate in getattr(response, "candidates", []) or []:
+            content = getattr(candidate, "content", None)
+            content_parts = getattr(content, "parts", None) if content else None
+            if not content_parts:
+                continue
+            for part in content_parts:
+                if getattr(part, "text", None):
+                    parts.append(part.text)
+        return "\n".join(parts).strip()
+
+    async def _embed(self, text: str) -> List[float]:
+        result = await self.client.aio.models.embed_content(
+            model=self.embedding_model_id, contents=text
+        )
+        return result.embeddings[0].values
 
     async def process_query(
-        self, query: str, context: Optional[Dict[str, Any]] = None
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        *,
+        question: Optional[str] = None,
+        coalesce: bool = True,
     ) -> Dict[str, Any]:
         try:
             prompt = query
             use_sql_model = False
 
-            sql_markers = [
-                "SQL query",
-                "raw SQL",
-                "generate a SQL",
-                "return only the raw sql",
-            ]
-            if any(marker.lower() in query.lower() for marker in sql_markers):
+            if _SQL_MARKER_RE.search(query):
                 prompt = f"{SQL_SYSTEM_PROMPT}\nRequested query:\n{query}"
                 use_sql_model = True
 
-            text = await self._generate_text(prompt, use_sql_model=use_sql_model)
+            # Exact repeats are free; the response depends on the prompt alone
+            cached = self.response_cache.get(prompt)
+            if cached is not None:
+                return {"response": cached}
+
+            # Semantic reuse only for SQL generation keyed on the bare question;
+            # other prompts carry row data and must never match approximately.
+            # The lookup runs before generating: the shared request is shielded,
+            # so a hit found mid-generation could not stop it being billed.
+            embedding = None
+            if use_sql_model and question and context is None:
+                embedding = await self.response_cache.embed_question(question)
+                if embedding is not None:
+                    cached = self.response_cache.match(question, embedding)
+                    if cached is not None:
+                        return {"response": cached}
+
+            text = await self._generate_text(
+                prompt, use_sql_model=use_sql_model, coalesce=coalesce
+            )
+            if text:
+                self.response_cache.set(prompt, text)
+                if embedding is not None:
+                    self.response_cache.store(question, text, embedding)
             return {"response": text}
         except Exception as exc:
             return {"error": str(exc)}
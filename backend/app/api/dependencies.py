@@ -1,29 +1,67 @@
 # File: backend/app/api/dependencies.py
 
+from functools import lru_cache
+
+import httpx
+
 from ..services.graph_service import GraphService
 from ..services.procedure_service import ProcedureService
 from ..services.report_service import ReportService
+from ..services.query_processor import QueryProcessor
 from ..database.connection import DatabaseConnection
+from ..cache.cache_manager import CacheManager
 from ..ai_providers.gemini_provider import GeminiProvider
 
-# Use the same database connection instance
+# Single shared instances for the whole app; main.py imports these too
 db = DatabaseConnection()
-ai_provider = GeminiProvider()
+graph_cache = CacheManager(ttl=300)
+# Results of AI-generated SQL; the sales data is read-mostly, see QueryProcessor.invalidate_table
+query_cache = CacheManager(ttl=300)
+procedure_cache = CacheManager(ttl=300)
+report_filter_cache = CacheManager(max_size=512, ttl=300)
+# Entry caps bound memory; an LLM round-trip costs far more than holding its reply
+ai_response_cache = CacheManager(max_size=10_000, ttl=24 * 3600)
+chart_cache = CacheManager(max_size=1000, ttl=300)
+# One pooled HTTP client shared by every Gemini call for the process lifetime
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=100, keepalive_expiry=60)
+)
+
+@lru_cache(maxsize=1)
+def get_ai_provider() -> GeminiProvider:
+    """
+    Build the shared GeminiProvider on first use.
+    """
+    return GeminiProvider(http_client=http_client)
 
+@lru_cache(maxsize=1)
 def get_graph_service() -> GraphService:
     """
     Dependency injection for GraphService.
     """
-    return GraphService(db)
+    return GraphService(db, graph_cache)
 
+@lru_cache(maxsize=1)
 def get_procedure_service() -> ProcedureService:
     """
     Dependency injection for ProcedureService.
     """
-    return ProcedureService(db)
+    return ProcedureService(db, procedure_cache)
 
+@lru_cache(maxsize=1)
 def get_report_service() -> ReportService:
     """
     Dependency injection for ReportService.
     """
-    return ReportService(db, ai_provider=ai_provider)
+    return ReportService(
+        db, ai_provider=get_ai_provider(), filter_cache=report_filter_cache
+    )
+
+@lru_cache(maxsize=1)
+def get_query_processor() -> QueryProcessor:
+    """
+    Dependency injection for QueryProcessor.
+    """
+    return QueryProcessor(
+        db, query_cache, get_ai_provider(), ai_response_cache, chart_cache
+    )
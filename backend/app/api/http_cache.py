@@ -0,0 +1,26 @@
+# File: backend/app/api/http_cache.py
+
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+
+def cached_json_response(request: Request, body: Any, max_age: int = 300) -> Response:
+    """
+    Return ``body`` as JSON with a content-hash ETag, or 304 if the client already has it.
+    """
+    payload = orjson.dumps(
+        body, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+    etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    client_etags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in client_etags or "*" in client_etags:
+        return Response(status_code=304, headers=headers)
+
+    # Reuse the bytes we hashed rather than serializing the body a second time
+    return Response(content=payload, media_type="application/json", headers=headers)
@@ -1,16 +1,22 @@
 # File: backend/app/api/main.py
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
+from typing import Any
+import asyncio
+import base64
 import logging
+import orjson
+import os
+from concurrent.futures import ThreadPoolExecutor
 from .routes.graph import router as graph_router
 from .routes.procedures import router as procedures_router
 from .routes.reports import router as reports_router
+from .dependencies import db, get_ai_provider, get_query_processor, http_client
 
-from ..database.connection import DatabaseConnection
-from ..cache.cache_manager import CacheManager
-from ..ai_providers.gemini_provider import GeminiProvider
 from ..services.query_processor import QueryProcessor
 
 logging.basicConfig(level=logging.INFO)
@@ -18,8 +24,30 @@ logger = logging.getLogger(__name__)
 
 class QueryRequest(BaseModel):
     query: str
+    # Also return the Vega-Lite spec; its data repeats the plotted rows of ``data``
+    include_spec: bool = False
 
-app = FastAPI(title="Business Analytics API")
+def _json_default(value: Any) -> Any:
+    # varbinary/image columns arrive as bytes, which jsonable_encoder would UTF-8 decode
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    return jsonable_encoder(value)
+
+class AppJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse that hands types orjson rejects to FastAPI's encoders
+    instead of failing the response.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+app = FastAPI(title="Business Analytics API", default_response_class=AppJSONResponse)
+app.state.http_client = http_client
 
 # CORS middleware setup
 app.add_middleware(
@@ -30,11 +58,35 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-db = DatabaseConnection()
-cache = CacheManager()
-ai_provider = GeminiProvider()
-query_processor = QueryProcessor(db, cache, ai_provider)
+@app.on_event("startup")
+async def configure_default_executor():
+    # Blocking work (model fitting, chart rendering) is offloaded via asyncio.to_thread
+    max_workers = (os.cpu_count() or 1) * 5
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=max_workers)
+    )
+
+@app.on_event("startup")
+async def warmup_database_pool():
+    try:
+        await db.warmup()
+        logger.info(f"Pre-warmed {db.pool_size} database connections")
+    except Exception as e:
+        logger.warning(f"Database pool warmup failed: {str(e)}")
+
+@app.on_event("shutdown")
+async def close_ai_provider():
+    # Only if it was ever built; constructing it here would need GEMINI_API_KEY
+    if get_ai_provider.cache_info().currsize:
+        await get_ai_provider().aclose()
+
+@app.on_event("shutdown")
+async def close_http_client():
+    await app.state.http_client.aclose()
+
+@app.on_event("shutdown")
+async def dispose_database_pool():
+    await db.dispose()
 
 # Include routers
 app.include_router(graph_router)
@@ -42,16 +94,24 @@ app.include_router(procedures_router)
 app.include_router(reports_router)
 
 @app.post("/api/query")
-async def process_query(request: QueryRequest):
+async def process_query(
+    request: QueryRequest,
+    query_processor: QueryProcessor = Depends(get_query_processor),
+):
     try:
         logger.info(f"Received query request: {request.query}")
-        result = await query_processor.process_query(request.query)
+        result = await query_processor.process_query(
+            request.query, include_spec=request.include_spec
+        )
         
         if "error" in result:
             logger.error(f"Error processing query: {result['error']}")
             raise HTTPException(status_code=500, detail=result["error"])
             
-        return result
+        # Returning the response directly skips FastAPI's jsonable_encoder walk over
+        # every row; orjson encodes floats and datetimes natively and only the rest
+        # (bytes, timedelta, ...) goes through the fallback
+        return AppJSONResponse(result)
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,28 +1,39 @@
 # File: backend/app/api/routes/graph.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import Dict
 import logging
 from ...services.graph_service import GraphService
 from ..dependencies import get_graph_service
+from ..http_cache import cached_json_response
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/graph", tags=["graph"])
 
 @router.get("/sales-organization")
 async def get_sales_organization_graph(
+    request: Request,
     graph_service: GraphService = Depends(get_graph_service)
-) -> Dict:
+) -> Response:
     """Get the sales organization graph data."""
     try:
         logger.info("Fetching sales organization graph data")
-        data = graph_service.get_sales_organization_graph()
+        data = await graph_service.get_sales_organization_graph()
         logger.info(f"Successfully retrieved graph with {len(data['nodes'])} nodes and {len(data['links'])} links")
-        return data
+        return cached_json_response(request, data)
     except Exception as e:
         logger.error(f"Failed to fetch graph data: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.delete("/cache")
+async def invalidate_graph_cache(
+    graph_service: GraphService = Depends(get_graph_service)
+) -> Dict:
+    """Drop the cached sales organization graph."""
+    graph_service.invalidate_graph_cache()
+    logger.info("Invalidated sales organization graph cache")
+    return {"status": "invalidated"}
+
 @router.get("/node/{node_id}")
 async def get_node_details(
     node_id: int,
@@ -31,7 +42,7 @@ async def get_node_details(
     """
     Endpoint to get detailed information about a specific node.
     """
-    details = graph_service.get_node_details(node_id)
+    details = await graph_service.get_node_details(node_id)
     if not details:
         raise HTTPException(status_code=404, detail="Node not found")
     return details
\ No newline at end of file
@@ -7,7 +7,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from ...services.procedure_service import ProcedureService
-from ..dependencies import get_procedure_service
+from ...database.connection import DatabaseBusyError
+from ..dependencies import db, get_procedure_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/procedures", tags=["procedures"])
@@ -18,23 +19,26 @@ class ProcedureExecutionRequest(BaseModel):
 
 
 @router.get("/")
-def list_procedures(
+async def list_procedures(
     procedure_service: ProcedureService = Depends(get_procedure_service),
 ) -> List[Dict[str, Any]]:
     """
     List stored procedures available in the connected database.
     """
     try:
-        procedures = procedure_service.list_stored_procedures()
+        async with db.slot():
+            procedures = await procedure_service.list_stored_procedures()
         logger.info("Returned %d stored procedures", len(procedures))
         return procedures
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except Exception as exc:
         logger.exception("Failed to list stored procedures")
         raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
 @router.get("/{schema}/{name}")
-def get_procedure_details(
+async def get_procedure_details(
     schema: str,
     name: str,
     procedure_service: ProcedureService = Depends(get_procedure_service),
@@ -43,12 +47,15 @@ def get_procedure_details(
     Retrieve metadata for a specific stored procedure.
     """
     try:
-        details = procedure_service.get_procedure_details(schema, name)
+        async with db.slot():
+            details = await procedure_service.get_procedure_details(schema, name)
         if not details:
             raise HTTPException(status_code=404, detail="Stored procedure not found")
         return details
     except HTTPException:
         raise
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except ValueError as exc:
         logger.warning(
             "Invalid stored procedure identifier requested: %s.%s", schema, name
@@ -60,7 +67,7 @@ def get_procedure_details(
 
 
 @router.post("/{schema}/{name}/execute")
-def execute_procedure(
+async def execute_procedure(
     schema: str,
     name: str,
     request: ProcedureExecutionRequest,
@@ -71,7 +78,8 @@ def execute_procedure(
     """
     parameters = request.parameters or {}
     try:
-        result = procedure_service.execute_procedure(schema, name, parameters)
+        async with db.slot():
+            result = await procedure_service.execute_procedure(schema, name, parameters)
         logger.info(
             "Executed stored procedure %s.%s in %.2fms",
             schema,
@@ -79,6 +87,8 @@ def execute_procedure(
             result.get("duration_ms", 0.0),
         )
         return result
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except ValueError as exc:
         logger.warning(
             "Invalid stored procedure request for %s.%s: %s", schema, name, str(exc)
@@ -5,16 +5,21 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
 from ...services.report_service import ReportService
+from ...database.connection import DatabaseBusyError
 from ..dependencies import get_report_service
+from ..http_cache import cached_json_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/reports", tags=["reports"])
 
+PPTX_CHUNK_SIZE = 64 * 1024
+
 
 class ForecastRequest(BaseModel):
     sales_org: Optional[str] = None
@@ -29,7 +34,8 @@ class ForecastRequest(BaseModel):
 
 
 @router.get("/filters")
-def get_report_filters(
+async def get_report_filters(
+    request: Request,
     sales_org: Optional[str] = None,
     country: Optional[str] = None,
     region: Optional[str] = None,
@@ -41,13 +47,16 @@ def get_report_filters(
     Fetch dropdown options honoring the current selections.
     """
     try:
-        return report_service.get_filter_options(
+        options = await report_service.get_filter_options(
             sales_org=sales_org,
             country=country,
             region=region,
             state=state,
             product_line=product_line,
         )
+        return cached_json_response(request, options)
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except ValueError as exc:
         logger.warning("Invalid filter request: %s", exc)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -58,8 +67,20 @@ def get_report_filters(
         ) from exc
 
 
+@router.delete("/filters/cache")
+async def invalidate_filter_cache(
+    report_service: ReportService = Depends(get_report_service),
+):
+    """
+    Drop cached dropdown options after the sales catalog changes.
+    """
+    report_service.invalidate_filter_cache()
+    logger.info("Invalidated report filter cache")
+    return {"status": "invalidated"}
+
+
 @router.post("/forecast")
-def create_forecast(
+async def create_forecast(
     request: ForecastRequest,
     report_service: ReportService = Depends(get_report_service),
 ):
@@ -67,7 +88,7 @@ def create_forecast(
     Build a forecasting report for the supplied filters.
     """
     try:
-        return report_service.generate_forecast(
+        return await report_service.generate_forecast(
             sales_org=request.sales_org,
             country=request.country,
             region=request.region,
@@ -78,6 +99,8 @@ def create_forecast(
             forecast_periods=request.forecast_periods,
             confidence_interval=request.confidence_interval,
         )
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except ValueError as exc:
         logger.warning("Forecast validation error: %s", exc)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -89,7 +112,7 @@ def create_forecast(
 
 
 @router.post("/pptx")
-def download_pptx(
+async def download_pptx(
     request: ForecastRequest,
     report_service: ReportService = Depends(get_report_service),
 ):
@@ -97,7 +120,7 @@ def download_pptx(
     Generate a PPTX report and return it as a downloadable file.
     """
     try:
-        pptx_bytes, filename = report_service.generate_pptx(
+        pptx_buffer, filename = await report_service.generate_pptx(
             sales_org=request.sales_org,
             country=request.country,
             region=request.region,
@@ -109,13 +132,16 @@ def download_pptx(
             confidence_interval=request.confidence_interval,
         )
         headers = {
-            "Content-Disposition": f'attachment; filename="{filename}"'
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Content-Length": str(pptx_buffer.getbuffer().nbytes),
         }
-        return Response(
-            content=pptx_bytes,
+        return StreamingResponse(
+            iter(lambda: pptx_buffer.read(PPTX_CHUNK_SIZE), b""),
             media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
             headers=headers,
         )
+    except DatabaseBusyError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
     except ValueError as exc:
         logger.warning("PPTX validation error: %s", exc)
         raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -1,29 +1,95 @@
 # backend/app/cache/cache_manager.py
+from collections import OrderedDict
 from functools import lru_cache
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import math
+import threading
 import time
 
-class CacheManager:
-    def __init__(self, max_size: int = 1000, ttl: int = 3600):
+class _CacheShard:
+    def __init__(self, max_size: int, ttl: int):
         self.ttl = ttl
-        self.cache: Dict[str, Dict[str, Any]] = {}
         self.max_size = max_size
+        self.lock = threading.Lock()
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # Min-heap of (expiry, key); entries may be stale after overwrites/evictions
+        self._expiries: List[Tuple[float, str]] = []
 
     def get(self, key: str) -> Optional[Any]:
-        if key in self.cache:
-            item = self.cache[key]
+        item = self.cache.get(key)
+        if item is not None:
             if time.time() - item['timestamp'] < self.ttl:
+                self.cache.move_to_end(key)
                 return item['value']
             del self.cache[key]
         return None
 
     def set(self, key: str, value: Any) -> None:
-        if len(self.cache) >= self.max_size:
-            # Remove oldest item
-            oldest = min(self.cache.items(), key=lambda x: x[1]['timestamp'])
-            del self.cache[oldest[0]]
-        
+        now = time.time()
+        self._evict_expired(now)
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        elif len(self.cache) >= self.max_size:
+            # Remove least recently used item
+            self.cache.popitem(last=False)
+
         self.cache[key] = {
             'value': value,
-            'timestamp': time.time()
-        }
\ No newline at end of file
+            'timestamp': now
+        }
+        heapq.heappush(self._expiries, (now + self.ttl, key))
+
+    def delete(self, key: str) -> None:
+        self.cache.pop(key, None)
+
+    def clear(self) -> None:
+        self.cache.clear()
+        self._expiries.clear()
+
+    def _evict_expired(self, now: float) -> None:
+        while self._expiries and self._expiries[0][0] <= now:
+            _, key = heapq.heappop(self._expiries)
+            item = self.cache.get(key)
+            if item is not None and now - item['timestamp'] >= self.ttl:
+                del self.cache[key]
+
+        if len(self._expiries) > 2 * self.max_size:
+            self._expiries = [
+                (item['timestamp'] + self.ttl, key) for key, item in self.cache.items()
+            ]
+            heapq.heapify(self._expiries)
+
+class CacheManager:
+    SHARD_COUNT = 16
+
+    def __init__(self, max_size: int = 1000, ttl: int = 3600):
+        self.ttl = ttl
+        self.max_size = max_size
+        shard_count = max(1, min(self.SHARD_COUNT, max_size))
+        shard_size = math.ceil(max_size / shard_count)
+        self._shards = [_CacheShard(shard_size, ttl) for _ in range(shard_count)]
+
+    def _shard(self, key: str) -> _CacheShard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: str) -> Optional[Any]:
+        shard = self._shard(key)
+        with shard.lock:
+            return shard.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.set(key, value)
+
+    def delete(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.delete(key)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.clear()
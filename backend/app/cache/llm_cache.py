@@ -0,0 +1,105 @@
+# backend/app/cache/llm_cache.py
+from collections import deque
+from hashlib import sha256
+from typing import Any, Awaitable, Callable, Optional, Sequence, Tuple
+import logging
+import re
+
+import numpy as np
+
+from .cache_manager import CacheManager
+
+logger = logging.getLogger(__name__)
+
+# Numbers, quoted strings and capitalised words (countries, product lines) must
+# match exactly; embeddings barely separate "Germany" from "France" or 2023 from 2024
+_LITERAL_RE = re.compile(r"(?<!\w)\"[^\"]*\"|(?<!\w)'[^']*'|\d+(?:[.,]\d+)?|[^\W\d_][\w-]*")
+_SENTENCE_END = (".", "!", "?", ":")
+
+class LLMCache:
+    """
+    Two-tier response cache: an exact SHA-256 lookup on the full prompt, then
+    cosine similarity over the embeddings of recent raw user questions (never
+    templated prompts or prompts carrying row data). A question is a semantic
+    hit when its similarity reaches ``threshold`` and its literals are the same.
+    """
+
+    def __init__(
+        self,
+        backend: CacheManager,
+        embed: Callable[[str], Awaitable[Sequence[float]]],
+        threshold: float = 0.92,
+        max_embeddings: int = 256,
+    ):
+        self.backend = backend
+        self.embed = embed
+        self.threshold = threshold
+        # (backend key, literals, normalized embedding), oldest first
+        self._entries: deque = deque(maxlen=max_embeddings)
+
+    @staticmethod
+    def _key(kind: str, text: str) -> str:
+        return f"llm:{kind}:{sha256(text.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def _literals(question: str) -> Tuple[str, ...]:
+        literals = []
+        for match in _LITERAL_RE.finditer(question):
+            token = match.group()
+            if token[0].isalpha():
+                if not token[0].isupper():
+                    continue
+                # A capital after a sentence break is grammar, not an entity
+                preceding = question[: match.start()].rstrip()
+                if not preceding or preceding.endswith(_SENTENCE_END):
+                    continue
+            literals.append(token.strip("\"'").casefold())
+        return tuple(sorted(literals))
+
+    def get(self, prompt: str) -> Optional[Any]:
+        return self.backend.get(self._key("prompt", prompt))
+
+    def set(self, prompt: str, response: Any) -> None:
+        self.backend.set(self._key("prompt", prompt), response)
+
+    async def embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Return the normalized embedding, or None if the embedding call fails."""
+        try:
+            embedding = np.asarray(await self.embed(question), dtype=np.float32)
+        except Exception as exc:
+            logger.warning("Question embedding failed, skipping semantic cache: %s", exc)
+            return None
+        embedding /= np.linalg.norm(embedding) or 1.0
+        return embedding
+
+    def match(self, question: str, embedding: np.ndarray) -> Optional[Any]:
+        if not self._entries:
+            return None
+
+        literals = self._literals(question)
+        similarities = np.stack([vector for _, _, vector in self._entries]) @ embedding
+        expired = set()
+        cached = None
+        for index in np.argsort(similarities)[::-1]:
+            if similarities[index] < self.threshold:
+                break
+            key, entry_literals, _ = self._entries[index]
+            if entry_literals != literals:
+                continue
+            cached = self.backend.get(key)
+            if cached is not None:
+                break
+            expired.add(int(index))
+
+        if expired:
+            # The backend's TTL/LRU dropped these; their embeddings can never hit again
+            self._entries = deque(
+                (entry for index, entry in enumerate(self._entries) if index not in expired),
+                maxlen=self._entries.maxlen,
+            )
+        return cached
+
+    def store(self, question: str, response: Any, embedding: np.ndarray) -> None:
+        key = self._key("question", question)
+        self.backend.set(key, response)
+        self._entries.append((key, self._literals(question), embedding))
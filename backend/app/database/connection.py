@@ -1,35 +1,86 @@
 # backend/app/database/connection.py
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from contextlib import asynccontextmanager
 from functools import lru_cache
+import asyncio
 import urllib.parse
-from typing import Generator
+from typing import AsyncGenerator, AsyncIterator
 import os
 
+class DatabaseBusyError(RuntimeError):
+    """No database slot freed up within ``DatabaseConnection.acquire_timeout``."""
+
 class DatabaseConnection:
     def __init__(self):
         self.server = 'dwh.hdm-server.eu'
         self.database = 'AdventureBikes Sales DataMart'
         self.username = os.getenv('DB_USERNAME', 'mike.farmer')
         self.password = urllib.parse.quote_plus(os.getenv('DB_PASSWORD', 'password123'))
+        self.pool_size = int(os.getenv('DB_POOL_MIN', '10'))
+        self.pool_max = max(int(os.getenv('DB_POOL_MAX', '50')), self.pool_size)
+        self.pool_recycle = 1800
+        self.pool_timeout = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+        # Caps concurrent DB work; callers that can't get a slot quickly are rejected
+        self.max_concurrency = int(os.getenv('DB_MAX_CONCURRENCY', '20'))
+        self.acquire_timeout = float(os.getenv('DB_ACQUIRE_TIMEOUT', '2'))
+        self._slots = asyncio.Semaphore(self.max_concurrency)
         self._engine = None
         self.SessionLocal = None
 
     @property
-    def engine(self):
+    def engine(self) -> AsyncEngine:
         if self._engine is None:
             conn_str = (
-                'mssql+pyodbc://'
+                'mssql+aioodbc://'
                 f'{self.username}:{self.password}@{self.server}/{self.database}'
                 '?driver=/opt/homebrew/lib/libmsodbcsql.17.dylib'
             )
-            self._engine = create_engine(conn_str, pool_pre_ping=True)
-            self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+            self._engine = create_async_engine(
+                conn_str,
+                pool_size=self.pool_size,
+                max_overflow=self.pool_max - self.pool_size,
+                pool_recycle=self.pool_recycle,
+                pool_timeout=self.pool_timeout,
+                pool_pre_ping=True,
+                # LIFO keeps reusing the warmest connections and lets surplus ones idle out
+                pool_use_lifo=True,
+            )
+            self.SessionLocal = async_sessionmaker(
+                bind=self._engine, class_=AsyncSession, autoflush=False
+            )
         return self._engine
 
-    def get_session(self) -> Generator:
-        db = self.SessionLocal()
+    async def warmup(self) -> None:
+        """Open ``pool_size`` connections up front so early requests skip the handshake."""
+        connections = await asyncio.gather(
+            *(self.engine.connect().start() for _ in range(self.pool_size))
+        )
+        await asyncio.gather(*(connection.close() for connection in connections))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of ``max_concurrency`` DB slots; hold it only around DB work."""
         try:
-            yield db
+            async with asyncio.timeout(self.acquire_timeout):
+                await self._slots.acquire()
+        except TimeoutError as exc:
+            raise DatabaseBusyError(
+                "The database is busy, please retry shortly."
+            ) from exc
+        try:
+            yield
         finally:
-            db.close()
\ No newline at end of file
+            self._slots.release()
+
+    async def dispose(self) -> None:
+        """Close pooled connections; the engine is rebuilt lazily on next use."""
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self.SessionLocal = None
+
+    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+        # SessionLocal is bound when the engine is first built
+        self.engine
+        async with self.SessionLocal() as db:
+            yield db
\ No newline at end of file
@@ -0,0 +1,32 @@
+-- backend/app/database/migrations/001_add_base_country.sql
+-- Persist the base country (text before the first space of [Sales Country])
+-- so the graph endpoints can read it from an index instead of recomputing
+-- SUBSTRING/CHARINDEX/TRIM for every row.
+
+IF COL_LENGTH('dbo.DataSet_Monthly_Sales_and_Quota', 'base_country') IS NULL
+BEGIN
+    ALTER TABLE dbo.DataSet_Monthly_Sales_and_Quota
+    ADD base_country AS (
+        LEFT(
+            LTRIM(RTRIM([Sales Country])),
+            CASE
+                WHEN CHARINDEX(' ', LTRIM(RTRIM([Sales Country]))) > 0
+                THEN CHARINDEX(' ', LTRIM(RTRIM([Sales Country]))) - 1
+                ELSE LEN(LTRIM(RTRIM([Sales Country])))
+            END
+        )
+    ) PERSISTED;
+END
+GO
+
+IF NOT EXISTS (
+    SELECT 1
+    FROM sys.indexes
+    WHERE name = 'IX_base_country'
+      AND object_id = OBJECT_ID('dbo.DataSet_Monthly_Sales_and_Quota')
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_base_country
+    ON dbo.DataSet_Monthly_Sales_and_Quota (base_country, [Sales Region], [Sales City]);
+END
+GO
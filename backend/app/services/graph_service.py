@@ -4,93 +4,118 @@ from typing import Dict, List, Optional
 import logging
 from sqlalchemy import text
 from ..database.connection import DatabaseConnection
+from ..cache.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
 
+SALES_HIERARCHY_SQL = text("""
+    SELECT DISTINCT
+        base_country,
+        TRIM([Sales Region]) as region,
+        TRIM([Sales City]) as office
+    FROM DataSet_Monthly_Sales_and_Quota
+    WHERE base_country IS NOT NULL
+    ORDER BY base_country, region, office
+""")
+
+# Filter column per node group; one statement per group keeps the server plan cache warm
+_NODE_FILTER_COLUMNS = {
+    "country": "base_country",
+    "region": "[Sales Region]",
+    "office": "[Sales City]",
+}
+
+# Node metrics and top products in one round-trip; the metrics row is
+# repeated on each product row (LEFT JOIN keeps it when there are none)
+NODE_DETAILS_SQL = {
+    group: text(f"""
+        WITH filtered AS (
+            SELECT *
+            FROM DataSet_Monthly_Sales_and_Quota
+            WHERE {column} = :param
+        ),
+        metrics AS (
+            SELECT
+                SUM([Revenue EUR]) as total_revenue,
+                SUM([Sales Amount]) as total_sales,
+                COUNT(DISTINCT [Sales City]) as num_offices,
+                COUNT(DISTINCT [Sales Country]) as num_countries,
+                COUNT(DISTINCT [Sales Organisation]) as num_channels,
+                COUNT(DISTINCT [Product Line]) as num_product_lines,
+                AVG(CAST([Discount EUR] as float) / NULLIF(CAST([Revenue EUR] as float), 0) * 100) as avg_discount
+            FROM filtered
+        ),
+        products AS (
+            SELECT
+                [Product Line] as product_line,
+                SUM([Sales Amount]) as total_sales,
+                SUM([Revenue EUR]) as total_revenue,
+                1 as has_product
+            FROM filtered
+            GROUP BY [Product Line]
+            ORDER BY SUM([Revenue EUR]) DESC
+            OFFSET 0 ROWS FETCH NEXT 5 ROWS ONLY
+        )
+        SELECT
+            m.total_revenue, m.total_sales, m.num_offices, m.num_countries,
+            m.num_channels, m.num_product_lines, m.avg_discount,
+            p.product_line, p.total_sales, p.total_revenue, p.has_product
+        FROM metrics m
+        LEFT JOIN products p ON 1 = 1
+        ORDER BY p.total_revenue DESC
+    """)
+    for group, column in _NODE_FILTER_COLUMNS.items()
+}
+
 class GraphService:
-    def __init__(self, db: DatabaseConnection):
+    GRAPH_CACHE_KEY = "graph:sales_org"
+
+    def __init__(self, db: DatabaseConnection, cache: CacheManager):
         self.db = db
+        self.cache = cache
 
-    def get_sales_organization_graph(self) -> Dict:
+    async def get_sales_organization_graph(self) -> Dict:
         """Generate the sales organization graph structure."""
+        cached_graph = self.cache.get(self.GRAPH_CACHE_KEY)
+        if cached_graph is not None:
+            return {"nodes": cached_graph["nodes"], "links": cached_graph["links"]}
+
         try:
-            with self.db.engine.connect() as connection:
-                # First get distinct countries (top level)
-                countries = connection.execute(text("""
-                    SELECT DISTINCT 
-                        SUBSTRING(TRIM([Sales Country]), 1, 
-                            CASE 
-                                WHEN CHARINDEX(' ', TRIM([Sales Country])) > 0 
-                                THEN CHARINDEX(' ', TRIM([Sales Country])) - 1
-                                ELSE LEN(TRIM([Sales Country]))
-                            END
-                        ) as base_country
-                    FROM DataSet_Monthly_Sales_and_Quota
-                    WHERE [Sales Country] IS NOT NULL
-                """)).fetchall()
-                
-                # Then get regions by country
-                regions = connection.execute(text("""
-                    SELECT DISTINCT 
-                        SUBSTRING(TRIM([Sales Country]), 1, 
-                            CASE 
-                                WHEN CHARINDEX(' ', TRIM([Sales Country])) > 0 
-                                THEN CHARINDEX(' ', TRIM([Sales Country])) - 1
-                                ELSE LEN(TRIM([Sales Country]))
-                            END
-                        ) as base_country,
-                        TRIM([Sales Region]) as region
-                    FROM DataSet_Monthly_Sales_and_Quota
-                    WHERE [Sales Region] IS NOT NULL
-                    AND [Sales Country] IS NOT NULL
-                """)).fetchall()
-                
-                # Finally get cities
-                offices = connection.execute(text("""
-                    SELECT DISTINCT 
-                        TRIM([Sales City]) as office,
-                        TRIM([Sales Region]) as region,
-                        SUBSTRING(TRIM([Sales Country]), 1, 
-                            CASE 
-                                WHEN CHARINDEX(' ', TRIM([Sales Country])) > 0 
-                                THEN CHARINDEX(' ', TRIM([Sales Country])) - 1
-                                ELSE LEN(TRIM([Sales Country]))
-                            END
-                        ) as base_country
-                    FROM DataSet_Monthly_Sales_and_Quota
-                    WHERE [Sales City] IS NOT NULL
-                    AND [Sales Region] IS NOT NULL
-                    AND [Sales Country] IS NOT NULL
-                """)).fetchall()
-
-                logger.info(f"Found {len(countries)} countries, {len(regions)} regions, and {len(offices)} offices")
+            async with self.db.engine.connect() as connection:
+                # Stream the whole hierarchy in one pass (base_country is a persisted column)
+                rows = await connection.stream(
+                    SALES_HIERARCHY_SQL, execution_options={"yield_per": 1000}
+                )
 
                 # Create nodes and links
                 nodes = []
                 links = []
                 node_id = 0
-
-                # Add country nodes (top level)
                 country_ids = {}
-                for country in countries:
-                    country_name = country[0]
-                    country_ids[country_name] = node_id
-                    nodes.append({
-                        "id": node_id,
-                        "name": country_name,
-                        "level": 1,
-                        "val": 15,
-                        "color": "#ff7043",
-                        "group": "country"
-                    })
-                    node_id += 1
-
-                # Add region nodes (middle level)
                 region_ids = {}
-                for region in regions:
-                    country_name, region_name = region[0], region[1]
-                    if country_name in country_ids:
-                        region_ids[f"{country_name}:{region_name}"] = node_id
+                office_count = 0
+
+                async for country_name, region_name, office_name in rows:
+                    # Add country nodes (top level)
+                    if country_name not in country_ids:
+                        country_ids[country_name] = node_id
+                        nodes.append({
+                            "id": node_id,
+                            "name": country_name,
+                            "level": 1,
+                            "val": 15,
+                            "color": "#ff7043",
+                            "group": "country"
+                        })
+                        node_id += 1
+
+                    if region_name is None:
+                        continue
+
+                    # Add region nodes (middle level)
+                    region_key = f"{country_name}:{region_name}"
+                    if region_key not in region_ids:
+                        region_ids[region_key] = node_id
                         nodes.append({
                             "id": node_id,
                             "name": region_name,
@@ -108,28 +133,37 @@ class GraphService:
                         })
                         node_id += 1
 
-                # Add office nodes (bottom level)
-                for office in offices:
-                    office_name, region_name, country_name = office[0], office[1], office[2]
-                    region_key = f"{country_name}:{region_name}"
-                    if region_key in region_ids:
-                        nodes.append({
-                            "id": node_id,
-                            "name": office_name,
-                            "level": 3,
-                            "val": 5,
-                            "color": "#66bb6a",
-                            "group": "office",
-                            "region": region_name,
-                            "country": country_name
-                        })
-                        # Link office to region
-                        links.append({
-                            "source": region_ids[region_key],
-                            "target": node_id,
-                            "value": 1
-                        })
-                        node_id += 1
+                    if office_name is None:
+                        continue
+
+                    # Add office nodes (bottom level)
+                    nodes.append({
+                        "id": node_id,
+                        "name": office_name,
+                        "level": 3,
+                        "val": 5,
+                        "color": "#66bb6a",
+                        "group": "office",
+                        "region": region_name,
+                        "country": country_name
+                    })
+                    # Link office to region
+                    links.append({
+                        "source": region_ids[region_key],
+                        "target": node_id,
+                        "value": 1
+                    })
+                    node_id += 1
+                    office_count += 1
+
+                logger.info(f"Found {len(country_ids)} countries, {len(region_ids)} regions, and {office_count} offices")
+
+                node_index = {node["id"]: node for node in nodes}
+                self.cache.set(self.GRAPH_CACHE_KEY, {
+                    "nodes": nodes,
+                    "links": links,
+                    "index": node_index
+                })
 
                 return {"nodes": nodes, "links": links}
 
@@ -137,66 +171,41 @@ class GraphService:
             logger.error(f"Error generating graph: {str(e)}")
             raise
 
-    def get_node_details(self, node_id: int) -> Optional[Dict]:
+    def invalidate_graph_cache(self) -> None:
+        """Drop the cached graph so the next request rebuilds it."""
+        self.cache.delete(self.GRAPH_CACHE_KEY)
+
+    async def get_node_details(self, node_id: int) -> Optional[Dict]:
         """Get detailed information about a specific node."""
         try:
-            with self.db.engine.connect() as connection:
-                # First get the node basic info from the graph
-                graph_data = self.get_sales_organization_graph()
-                node = next((n for n in graph_data["nodes"] if n["id"] == node_id), None)
-                
-                if not node:
-                    return None
-
-                # Query for additional metrics based on node type
-                if node["group"] == "region":
-                    where_clause = "[Sales Region] = :param"
-                elif node["group"] == "country":
-                    where_clause = "[Sales Country] = :param"
-                else:  # office
-                    where_clause = "[Sales City] = :param"
-
-                metrics_query = text(f"""
-                    SELECT 
-                        SUM([Revenue EUR]) as total_revenue,
-                        SUM([Sales Amount]) as total_sales,
-                        COUNT(DISTINCT [Sales City]) as num_offices,
-                        COUNT(DISTINCT [Sales Country]) as num_countries,
-                        COUNT(DISTINCT [Sales Organisation]) as num_channels,
-                        COUNT(DISTINCT [Product Line]) as num_product_lines,
-                        AVG(CAST([Discount EUR] as float) / NULLIF(CAST([Revenue EUR] as float), 0) * 100) as avg_discount
-                    FROM DataSet_Monthly_Sales_and_Quota
-                    WHERE {where_clause}
-                """)
-                
-                metrics_result = connection.execute(metrics_query, {"param": node["name"]}).fetchone()
+            # First get the node basic info from the cached graph
+            cached_graph = self.cache.get(self.GRAPH_CACHE_KEY)
+            if cached_graph is None:
+                await self.get_sales_organization_graph()
+                cached_graph = self.cache.get(self.GRAPH_CACHE_KEY)
+            node = cached_graph["index"].get(node_id) if cached_graph else None
+
+            if not node:
+                return None
+
+            async with self.db.engine.connect() as connection:
+                # Query metrics and top products for the node in one round-trip
+                params = {"param": node["name"]}
+                rows = (await connection.execute(NODE_DETAILS_SQL[node["group"]], params)).fetchall()
                 metrics = dict(zip(
                     ['total_revenue', 'total_sales', 'num_offices', 'num_countries', 
                      'num_channels', 'num_product_lines', 'avg_discount'],
-                    metrics_result
-                )) if metrics_result else {}
-
-                # Get top products for this node
-                products_query = text(f"""
-                    SELECT 
-                        [Product Line] as product_line,
-                        SUM([Sales Amount]) as total_sales,
-                        SUM([Revenue EUR]) as total_revenue
-                    FROM DataSet_Monthly_Sales_and_Quota
-                    WHERE {where_clause}
-                    GROUP BY [Product Line]
-                    ORDER BY SUM([Revenue EUR]) DESC
-                    OFFSET 0 ROWS FETCH NEXT 5 ROWS ONLY
-                """)
-                
-                products_result = connection.execute(products_query, {"param": node["name"]}).fetchall()
+                    rows[0][:7]
+                )) if rows else {}
+
                 top_products = [
                     {
-                        "Product_Line": row[0],
-                        "total_sales": row[1],
-                        "total_revenue": row[2]
+                        "Product_Line": row[7],
+                        "total_sales": row[8],
+                        "total_revenue": row[9]
                     }
-                    for row in products_result
+                    for row in rows
+                    if row[10]
                 ]
 
                 return {
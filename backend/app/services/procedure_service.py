@@ -4,17 +4,91 @@ Service for working with SQL Server stored procedures.
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
 import re
 import time
 
-from sqlalchemy import text
+from sqlalchemy import TextClause, text
 
+from ..cache.cache_manager import CacheManager
 from ..database.connection import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+LIST_PROCEDURES_SQL = text("""
+SELECT
+    s.name AS [schema],
+    p.name AS [name],
+    CAST(
+        CASE
+            WHEN EXISTS (
+                SELECT 1
+                FROM sys.parameters pa
+                WHERE pa.object_id = p.object_id
+                  AND pa.is_output = 0
+            )
+            THEN 1 ELSE 0
+        END AS bit
+    ) AS has_parameters,
+    CONVERT(varchar(33), p.create_date, 126) AS created_at,
+    CONVERT(varchar(33), p.modify_date, 126) AS updated_at,
+    LEFT(ISNULL(m.definition, ''), 200) AS definition_snippet
+FROM sys.procedures p
+INNER JOIN sys.schemas s ON p.schema_id = s.schema_id
+LEFT JOIN sys.sql_modules m ON p.object_id = m.object_id
+ORDER BY s.name, p.name
+""")
+
+PROCEDURE_DETAILS_SQL = text("""
+SELECT
+    s.name AS schema_name,
+    o.name AS procedure_name,
+    COALESCE(m.definition, OBJECT_DEFINITION(o.object_id)) AS definition,
+    p.name AS parameter_name,
+    TYPE_NAME(p.system_type_id) AS data_type,
+    p.max_length AS max_length,
+    p.precision AS numeric_precision,
+    p.scale AS numeric_scale,
+    CASE WHEN p.is_output = 1 THEN 'OUT' ELSE 'IN' END AS parameter_mode,
+    p.is_output AS is_output,
+    p.has_default_value AS has_default_value,
+    p.parameter_id AS ordinal_position
+FROM sys.all_objects o
+INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
+LEFT JOIN sys.sql_modules m ON o.object_id = m.object_id
+LEFT JOIN sys.all_parameters p ON p.object_id = o.object_id
+WHERE s.name = :schema
+  AND o.name = :name
+  AND o.type IN ('P', 'X')
+ORDER BY p.parameter_id
+""")
+
+
+_BIT_VALUES = {
+    "1": True, "true": True, "yes": True, "on": True,
+    "0": False, "false": False, "no": False, "off": False,
+}
+
+
+def _to_bit(value: str) -> bool:
+    try:
+        return _BIT_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError(f"Cannot convert '{value}' to BIT.") from None
+
+
+# SQL type name -> converter for string inputs; other types pass through as-is
+_COERCERS: Dict[str, Callable[[str], Any]] = {
+    **{sql_type: int for sql_type in ("int", "smallint", "tinyint", "bigint")},
+    **{
+        sql_type: float
+        for sql_type in ("decimal", "numeric", "money", "smallmoney", "float", "real")
+    },
+    "bit": _to_bit,
+}
+
 
 class ProcedureService:
     """
@@ -25,141 +99,111 @@ class ProcedureService:
 
     _IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
 
-    def __init__(self, db: DatabaseConnection) -> None:
+    def __init__(self, db: DatabaseConnection, metadata_cache: CacheManager) -> None:
         self.db = db
+        self.metadata_cache = metadata_cache
 
-    def list_stored_procedures(self) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _metadata_key(schema: str, name: str) -> str:
+        return f"procedure:{schema}.{name}"
+
+    def invalidate(self, schema: str, name: str) -> None:
         """
-        Return a summary list of stored procedures available in the database.
+        Drop cached metadata for a procedure, e.g. after it has been altered.
         """
-        query = text(
-            """
-            SELECT
-                s.name AS schema_name,
-                p.name AS procedure_name,
-                p.create_date AS create_date,
-                p.modify_date AS modify_date,
-                CASE
-                    WHEN EXISTS (
-                        SELECT 1
-                        FROM sys.parameters pa
-                        WHERE pa.object_id = p.object_id
-                          AND pa.is_output = 0
-                    )
-                    THEN 1 ELSE 0
-                END AS has_parameters,
-                LEFT(ISNULL(m.definition, ''), 200) AS definition_snippet
-            FROM sys.procedures p
-            INNER JOIN sys.schemas s ON p.schema_id = s.schema_id
-            LEFT JOIN sys.sql_modules m ON p.object_id = m.object_id
-            ORDER BY s.name, p.name
-            """
+        self.metadata_cache.delete(
+            self._metadata_key(
+                self._normalize_identifier(schema), self._normalize_identifier(name)
+            )
         )
 
-        with self.db.engine.connect() as connection:
-            result = connection.execute(query)
-            procedures: List[Dict[str, Any]] = []
-            for row in result.mappings():
-                procedures.append(
-                    {
-                        "schema": row["schema_name"],
-                        "name": row["procedure_name"],
-                        "has_parameters": bool(row["has_parameters"]),
-                        "created_at": row["create_date"].isoformat()
-                        if row["create_date"]
-                        else None,
-                        "updated_at": row["modify_date"].isoformat()
-                        if row["modify_date"]
-                        else None,
-                        "definition_snippet": row["definition_snippet"].strip(),
-                    }
-                )
+    async def _get_cached_procedure_details(
+        self, safe_schema: str, safe_name: str
+    ) -> Optional[Dict[str, Any]]:
+        cached = self.metadata_cache.get(self._metadata_key(safe_schema, safe_name))
+        if cached is not None:
+            return cached
+        return await self.get_procedure_details(safe_schema, safe_name)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _exec_statement(
+        quoted_schema: str, quoted_name: str, assignments: Tuple[str, ...]
+    ) -> TextClause:
+        # One statement object per procedure and supplied-parameter set, so the
+        # same EXEC text (and its cached plan) is reused across calls.
+        sql = f"SET NOCOUNT ON; EXEC {quoted_schema}.{quoted_name}"
+        if assignments:
+            sql = f"{sql} {', '.join(assignments)}"
+        return text(sql)
+
+    async def list_stored_procedures(self) -> List[Dict[str, Any]]:
+        """
+        Return a summary list of stored procedures available in the database.
+        """
+        async with self.db.engine.connect() as connection:
+            result = await connection.execute(LIST_PROCEDURES_SQL)
+            # Dates are formatted server-side; only the snippet still needs a
+            # Python strip, as LTRIM/RTRIM leave the definition's CR/LF behind
+            procedures: List[Dict[str, Any]] = [
+                {**row, "definition_snippet": row["definition_snippet"].strip()}
+                for row in result.mappings()
+            ]
 
         logger.info("Listed %d stored procedures", len(procedures))
         return procedures
 
-    def get_procedure_details(self, schema: str, name: str) -> Optional[Dict[str, Any]]:
+    async def get_procedure_details(self, schema: str, name: str) -> Optional[Dict[str, Any]]:
         """
         Retrieve metadata (definition and parameters) for a specific stored procedure.
         """
         safe_schema = self._normalize_identifier(schema)
         safe_name = self._normalize_identifier(name)
 
-        definition_query = text(
-            """
-            SELECT
-                s.name AS schema_name,
-                o.name AS procedure_name,
-                o.object_id AS object_id,
-                COALESCE(m.definition, OBJECT_DEFINITION(o.object_id)) AS definition
-            FROM sys.all_objects o
-            INNER JOIN sys.schemas s ON o.schema_id = s.schema_id
-            LEFT JOIN sys.sql_modules m ON o.object_id = m.object_id
-            WHERE s.name = :schema
-              AND o.name = :name
-              AND o.type IN ('P', 'X')
-            """
-        )
+        # One round-trip: the definition repeats on every parameter row, and a
+        # procedure without parameters comes back as a single row of NULLs.
+        async with self.db.engine.connect() as connection:
+            rows = (
+                await connection.execute(
+                    PROCEDURE_DETAILS_SQL, {"schema": safe_schema, "name": safe_name}
+                )
+            ).mappings().all()
 
-        params_query = text(
-            """
-            SELECT
-                p.name AS parameter_name,
-                TYPE_NAME(p.system_type_id) AS data_type,
-                p.max_length AS max_length,
-                p.precision AS numeric_precision,
-                p.scale AS numeric_scale,
-                CASE WHEN p.is_output = 1 THEN 'OUT' ELSE 'IN' END AS parameter_mode,
-                p.is_output AS is_output,
-                p.has_default_value AS has_default_value,
-                p.parameter_id AS ordinal_position
-            FROM sys.all_parameters p
-            WHERE p.object_id = :object_id
-            ORDER BY p.parameter_id
-            """
-        )
+        if not rows:
+            return None
 
-        with self.db.engine.connect() as connection:
-            definition_result = connection.execute(
-                definition_query, {"schema": safe_schema, "name": safe_name}
-            ).mappings().first()
-
-            if not definition_result:
-                return None
-
-            object_id = definition_result["object_id"]
-            params_result = connection.execute(
-                params_query, {"object_id": object_id}
-            ).mappings()
-
-            parameters: List[Dict[str, Any]] = []
-            for row in params_result:
-                param_name = row["parameter_name"]
-                is_output = bool(row["is_output"])
-                has_default = bool(row["has_default_value"])
-                parameters.append(
-                    {
-                        "name": param_name,
-                        "short_name": param_name.lstrip("@"),
-                        "data_type": row["data_type"],
-                        "max_length": row["max_length"],
-                        "numeric_precision": row["numeric_precision"],
-                        "numeric_scale": row["numeric_scale"],
-                        "mode": row["parameter_mode"],
-                        "is_result": False,
-                        "is_required": not is_output and not has_default,
-                        "ordinal_position": row["ordinal_position"],
-                    }
-                )
+        parameters: List[Dict[str, Any]] = []
+        for row in rows:
+            param_name = row["parameter_name"]
+            if param_name is None:
+                continue
+            is_output = bool(row["is_output"])
+            has_default = bool(row["has_default_value"])
+            parameters.append(
+                {
+                    "name": param_name,
+                    "short_name": param_name.lstrip("@"),
+                    "data_type": row["data_type"],
+                    "max_length": row["max_length"],
+                    "numeric_precision": row["numeric_precision"],
+                    "numeric_scale": row["numeric_scale"],
+                    "mode": row["parameter_mode"],
+                    "is_result": False,
+                    "is_required": not is_output and not has_default,
+                    "ordinal_position": row["ordinal_position"],
+                }
+            )
 
-        return {
+        details = {
             "schema": safe_schema,
             "name": safe_name,
-            "definition": (definition_result["definition"] or "").strip(),
+            "definition": (rows[0]["definition"] or "").strip(),
             "parameters": parameters,
         }
+        self.metadata_cache.set(self._metadata_key(safe_schema, safe_name), details)
+        return details
 
-    def execute_procedure(
+    async def execute_procedure(
         self,
         schema: str,
         name: str,
@@ -169,10 +213,10 @@ class ProcedureService:
         Execute the specified stored procedure with the provided parameters.
         """
         parameters = parameters or {}
-        safe_schema = self._normalize_identifier(schema)
-        safe_name = self._normalize_identifier(name)
+        safe_schema, quoted_schema = self._safe_ident(schema)
+        safe_name, quoted_name = self._safe_ident(name)
 
-        metadata = self.get_procedure_details(safe_schema, safe_name)
+        metadata = await self._get_cached_procedure_details(safe_schema, safe_name)
         if not metadata:
             raise ValueError("Stored procedure not found.")
 
@@ -180,13 +224,16 @@ class ProcedureService:
             entry["short_name"]: entry for entry in metadata.get("parameters", [])
         }
 
+        normalized_parameters = self._normalize_parameter_keys(parameters)
         bound_parameters: Dict[str, Any] = {}
         assignments: List[str] = []
 
         for short_name, details in param_definitions.items():
             original_name = details["name"]
             placeholder = self._sanitize_identifier(short_name)
-            provided_value = self._pick_parameter_value(parameters, short_name)
+            provided_value = self._pick_parameter_value(
+                parameters, normalized_parameters, short_name
+            )
 
             if provided_value in ("", None) and details["is_required"]:
                 raise ValueError(f"Parameter '{original_name}' is required.")
@@ -200,23 +247,17 @@ class ProcedureService:
             )
             assignments.append(f"{original_name} = :{placeholder}")
 
-        sql = (
-            "SET NOCOUNT ON; EXEC "
-            f"{self._quote_identifier(safe_schema)}."
-            f"{self._quote_identifier(safe_name)}"
-        )
-        if assignments:
-            sql = f"{sql} {', '.join(assignments)}"
+        statement = self._exec_statement(quoted_schema, quoted_name, tuple(assignments))
 
         start_time = time.perf_counter()
-        with self.db.engine.connect() as connection:
+        async with self.db.engine.connect() as connection:
             logger.info(
                 "Executing stored procedure %s.%s with parameters %s",
                 safe_schema,
                 safe_name,
                 list(bound_parameters.keys()),
             )
-            result = connection.execute(text(sql), bound_parameters)
+            result = await connection.execute(statement, bound_parameters)
 
             data: List[Dict[str, Any]] = []
             columns: List[str] = []
@@ -263,17 +304,29 @@ class ProcedureService:
         return trimmed
 
     @staticmethod
-    def _quote_identifier(value: str) -> str:
+    @lru_cache(maxsize=1024)
+    def _safe_ident(value: str) -> Tuple[str, str]:
         """
-        Safely quote identifiers for inclusion in EXEC statements.
+        Normalize an identifier once and return it both plain and bracket-quoted.
         """
         normalized = ProcedureService._normalize_identifier(value)
         escaped = normalized.replace("]", "]]")
-        return f"[{escaped}]"
+        return normalized, f"[{escaped}]"
+
+    @staticmethod
+    def _normalize_parameter_keys(provided: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Index supplied parameters by lower-cased name without '@'; the first
+        spelling of a name wins, matching the old linear scan.
+        """
+        normalized: Dict[str, Any] = {}
+        for key, value in provided.items():
+            normalized.setdefault(key.lstrip("@").lower(), value)
+        return normalized
 
     @staticmethod
     def _pick_parameter_value(
-        provided: Dict[str, Any], short_name: str
+        provided: Dict[str, Any], normalized: Dict[str, Any], short_name: str
     ) -> Optional[Any]:
         """
         Allow clients to provide parameters either with or without the leading '@'.
@@ -285,14 +338,8 @@ class ProcedureService:
         if with_at in provided:
             return provided[with_at]
 
-        # Handle case-sensitivity by trying case insensitive search
-        lowered = short_name.lower()
-        for key, value in provided.items():
-            normalized_key = key.lstrip("@").lower()
-            if normalized_key == lowered:
-                return value
-
-        return None
+        # Handle case-sensitivity via the pre-normalized lookup
+        return normalized.get(short_name.lower())
 
     @staticmethod
     def _coerce_parameter_value(value: Any, data_type: Optional[str]) -> Any:
@@ -312,17 +359,5 @@ class ProcedureService:
         if stripped == "":
             return None
 
-        sql_type = (data_type or "").lower()
-
-        if sql_type in {"int", "smallint", "tinyint", "bigint"}:
-            return int(stripped)
-        if sql_type in {"decimal", "numeric", "money", "smallmoney", "float", "real"}:
-            return float(stripped)
-        if sql_type in {"bit"}:
-            if stripped.lower() in {"1", "true", "yes", "on"}:
-                return True
-            if stripped.lower() in {"0", "false", "no", "off"}:
-                return False
-            raise ValueError(f"Cannot convert '{value}' to BIT.")
-
-        return value
+        converter = _COERCERS.get((data_type or "").lower())
+        return converter(stripped) if converter else value
@@ -1,12 +1,23 @@
 # backend/app/services/query_processor.py
 from typing import Dict, Any, Optional, Tuple
-import base64
-import json
+from datetime import date
+from decimal import Decimal
+from functools import lru_cache
+from hashlib import blake2b
+import asyncio
+import itertools
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 import logging
+import re
 
 import altair as alt
+import orjson
 import pandas as pd
 import vl_convert as vlc
+from sqlalchemy import text
 
 from ..database.connection import DatabaseConnection
 from ..cache.cache_manager import CacheManager
@@ -17,20 +28,103 @@ logger = logging.getLogger(__name__)
 
 alt.data_transformers.disable_max_rows()
 
+DESCRIBE_RESULT_SET_SQL = text("EXEC sp_describe_first_result_set @tsql = :tsql")
+# SQL Server base types under the Python type names _heuristic_viz_config expects
+_SQL_TYPE_NAMES = {
+    **dict.fromkeys(("tinyint", "smallint", "int", "bigint"), "int"),
+    **dict.fromkeys(("decimal", "numeric", "money", "smallmoney", "float", "real"), "float"),
+    "date": "date",
+    **dict.fromkeys(
+        ("datetime", "datetime2", "smalldatetime", "datetimeoffset"), "datetime"
+    ),
+}
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Table after FROM/JOIN, optionally schema-qualified and bracketed
+_TABLE_REF_RE = re.compile(
+    r"\b(?:from|join)\s+((?:\[[^\]]+\]|\w+)(?:\.(?:\[[^\]]+\]|\w+))*)", re.IGNORECASE
+)
+# Year, year-month or ISO date strings such as [Calendar Year] / [Calendar Month ISO]
+_ISO_PERIOD_RE = re.compile(r"^\d{4}(?:-\d{2}){0,2}$")
+_SAFE_SELECT_RE = re.compile(r"^\s*(?:with|select)\b", re.IGNORECASE)
+# A semicolon followed by anything other than more trailing semicolons starts a second statement
+_INNER_SEMICOLON_RE = re.compile(r";(?!;*\s*$)")
+# Markdown code fence around model output, with any language tag (sql, tsql, ...)
+# on the fence line or alone on the next one; the closing fence is optional
+_SQL_FENCE_RE = re.compile(
+    r"^\s*```[A-Za-z]*\s*(?:t?sql\b)?\s*(.*?)\s*(?:```\s*)?$", re.DOTALL | re.IGNORECASE
+)
+
 class QueryProcessor:
-    def __init__(self, db: DatabaseConnection, cache: CacheManager, ai_provider: AIProvider):
+    # Above this many rows, marks are aggregated (bar/line) or sampled (scatter) before rendering
+    CHART_MAX_POINTS = 10_000
+
+    def __init__(
+        self,
+        db: DatabaseConnection,
+        cache: CacheManager,
+        ai_provider: AIProvider,
+        response_cache: Optional[CacheManager] = None,
+        chart_cache: Optional[CacheManager] = None,
+    ):
         self.db = db
         self.cache = cache
         self.ai_provider = ai_provider
+        # Visualization configs and analyses live longer than raw SQL results
+        self.response_cache = response_cache or CacheManager()
+        # Rendered specs/PNGs are large and cheap to rebuild next to an LLM call
+        self.chart_cache = chart_cache or CacheManager(ttl=300)
+        # Bumped by invalidate_table; part of every SQL cache key for that table
+        self._table_generations: Dict[str, int] = {}
+        # Tags each fetched result, so charts are keyed per fetch rather than by
+        # hashing every row, and a re-fetch never reuses a chart of the old rows
+        self._result_ids = itertools.count()
+
+    @staticmethod
+    def _table_name(identifier: str) -> str:
+        return identifier.split(".")[-1].strip("[]").lower()
+
+    def invalidate_table(self, name: str) -> None:
+        """
+        Orphan cached results of every query reading ``name``; they age out of the LRU.
+        """
+        table = self._table_name(name)
+        self._table_generations[table] = self._table_generations.get(table, 0) + 1
+
+    @staticmethod
+    def _response_cache_key(kind: str, *parts: Any) -> str:
+        digest = blake2b(
+            orjson.dumps(parts, default=str, option=orjson.OPT_SORT_KEYS), digest_size=16
+        ).hexdigest()
+        return f"{kind}:{digest}"
 
     def _normalize_visualization_config(
         self, data: Dict[str, Any], config: Dict[str, Any]
     ) -> Dict[str, Any]:
-        columns = data.get("columns", []) or []
+        # Dashboard reloads repeat the same columns and config, so normalize each pair once
+        config_json = (
+            orjson.dumps(config, default=str, option=orjson.OPT_SORT_KEYS)
+            if isinstance(config, dict)
+            else b"{}"
+        )
+        # The cache holds serialized results so no caller can mutate another's config
+        return orjson.loads(
+            self._normalize_visualization_config_cached(
+                tuple(data.get("columns", []) or []), config_json
+            )
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _normalize_visualization_config_cached(
+        columns: Tuple[str, ...], config_json: bytes
+    ) -> bytes:
+        columns = list(columns)
+        config = orjson.loads(config_json)
         default_x_axis = columns[0] if columns else ""
         default_y_axis = columns[1:] if len(columns) > 1 else (columns[:1] if columns else [])
 
-        safe_config = config if isinstance(config, dict) else {}
+        safe_config = config
         raw_type = safe_config.get("type", "bar")
         raw_x_axis = safe_config.get("x_axis") or default_x_axis
         raw_y_axis = safe_config.get("y_axis", default_y_axis)
@@ -47,7 +141,7 @@ class QueryProcessor:
 
         format_config = safe_config.get("format") or {"prefix": "", "suffix": ""}
 
-        return {
+        return orjson.dumps({
             "type": raw_type if raw_type in {"bar", "line", "multiple", "scatter", "pie"} else "bar",
             "x_axis": raw_x_axis,
             "y_axis": y_axis,
@@ -56,46 +150,244 @@ class QueryProcessor:
                 "prefix": format_config.get("prefix", ""),
                 "suffix": format_config.get("suffix", ""),
             },
-        }
+        })
 
     def _clean_sql(self, raw_sql: str) -> str:
         if not raw_sql:
             return ""
 
         cleaned = raw_sql.strip()
+        # The SQL system prompt asks for unfenced output, so most replies skip the regex
+        if not cleaned.startswith("```"):
+            return cleaned
+
+        match = _SQL_FENCE_RE.match(cleaned)
+        return match.group(1) if match else cleaned
+
+    def _sql_cache_key(self, sql_query: str) -> str:
+        # Case is kept as-is so string literals in the query still distinguish keys
+        normalized = _WHITESPACE_RE.sub(" ", sql_query.strip().rstrip(";"))
+        tables = sorted({self._table_name(t) for t in _TABLE_REF_RE.findall(normalized)})
+        generations = ",".join(
+            f"{table}={self._table_generations.get(table, 0)}" for table in tables
+        )
+        digest = blake2b(f"{generations}|{normalized}".encode("utf-8"), digest_size=16)
+        return f"sql:{digest.hexdigest()}"
+
+    @staticmethod
+    def _decimal_columns(columns: list[str], rows: list) -> list[str]:
+        """
+        Columns that may hold Decimal values, judged by the first non-null value in
+        ``rows``; all-null columns stay in so later rows are still checked.
+        """
+        decimal_columns = []
+        for index, column in enumerate(columns):
+            value = next((row[index] for row in rows if row[index] is not None), None)
+            if value is None or isinstance(value, Decimal):
+                decimal_columns.append(column)
+        return decimal_columns
+
+    async def execute_sql_query(self, sql_query: str) -> Dict[str, Any]:
+        cache_key = self._sql_cache_key(sql_query)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"SQL cache hit: {cache_key}")
+            return cached
 
-        if cleaned.startswith("```"):
-            lines = [
-                line
-                for line in cleaned.splitlines()
-                if not line.strip().startswith("```")
-                and line.strip().lower() != "sql"
-            ]
-            cleaned = "\n".join(lines).strip()
-
-        return cleaned
-
-    async def execute_sql_query(self, sql_query: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         try:
-            logger.info(f"Executing SQL query: {sql_query}")
+            logger.info(f"SQL cache miss, executing SQL query: {sql_query}")
             
-            with self.db.engine.connect() as connection:
-                df = pd.read_sql(sql_query, connection)
-                logger.info(f"Query returned {len(df)} rows")
+            async with self.db.engine.connect() as connection:
+                # Server-side cursor fetched 1000 rows at a time, so the driver
+                # never buffers the whole result set next to the payload
+                result = await connection.stream(
+                    text(sql_query), execution_options={"yield_per": 1000}
+                )
+                columns = list(result.keys())
+                data = []
+                decimal_columns = None
+                async for partition in result.partitions():
+                    if decimal_columns is None:
+                        decimal_columns = self._decimal_columns(columns, partition)
+                    for row in partition:
+                        record = dict(zip(columns, row))
+                        # money/numeric columns arrive as Decimal, which the JSON response can't encode
+                        for column in decimal_columns:
+                            value = record[column]
+                            if isinstance(value, Decimal):
+                                record[column] = float(value)
+                        data.append(record)
+                logger.info(f"Query returned {len(data)} rows")
+                # Prompt fragments are built once here and reused (and cached) with the rows
                 payload = {
-                    "data": df.to_dict(orient='records'),
-                    "columns": df.columns.tolist()
+                    "result_key": f"{cache_key}:{next(self._result_ids)}",
+                    "data": data,
+                    "columns": columns,
+                    "columns_csv": ", ".join(columns),
+                    "sample_json": orjson.dumps(data[:5], default=str).decode(),
                 }
-                return df, payload
+                self.cache.set(cache_key, payload)
+                return payload
         except Exception as e:
             logger.error(f"SQL Error: {str(e)}")
-            return pd.DataFrame(), {"error": f"SQL Error: {str(e)}"}
+            return {"error": f"SQL Error: {str(e)}"}
 
-    async def determine_visualization(self, data: Dict[str, Any], question: str) -> Dict[str, Any]:
+    async def _describe_result_columns(self, sql_query: str) -> Optional[Dict[str, str]]:
+        """
+        Ask SQL Server for the result set's column names and types without running the query.
+        """
+        try:
+            async with self.db.engine.connect() as connection:
+                result = await connection.execute(
+                    DESCRIBE_RESULT_SET_SQL,
+                    {"tsql": sql_query},
+                )
+                described = [
+                    (row["name"], row["system_type_name"]) for row in result.mappings()
+                ]
+        except Exception as e:
+            logger.warning(f"Could not describe result set, waiting for data: {str(e)}")
+            return None
+        if not described or any(name is None for name, _ in described):
+            return None
+        return dict(described)
+
+    async def _early_visualization(
+        self, sql_query: str, question: str
+    ) -> Optional[Dict[str, Any]]:
+        column_types = await self._describe_result_columns(sql_query)
+        if column_types is None:
+            return None
+        columns = list(column_types)
+        # Typed like fetched rows so the heuristic can decide before any prompt is sent
+        column_types = {
+            column: _SQL_TYPE_NAMES.get(sql_type.split("(")[0].strip().lower(), "str")
+            for column, sql_type in column_types.items()
+        }
+        # Uncoalesced so cancelling this task (the rows settled it) stops the request
+        config = await self.determine_visualization(
+            {"columns": columns, "data": [], "column_types": column_types},
+            question,
+            coalesce=False,
+        )
+        return {"columns": columns, "config": config}
+
+    @staticmethod
+    def _infer_column_types(data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Name each column's Python type from its first non-null value.
+        """
+        column_types = {}
+        for column in data.get("columns", []):
+            value = next(
+                (row[column] for row in data["data"] if row.get(column) is not None), None
+            )
+            column_types[column] = type(value).__name__ if value is not None else "unknown"
+        return column_types
+
+    async def _resolve_visualization(
+        self,
+        early_task: Optional[asyncio.Task],
+        query_result: Dict[str, Any],
+        question: str,
+    ) -> Dict[str, Any]:
+        # The early task only sees SQL type names and no rows, so the type heuristic
+        # can't fire there; try it on the real rows before waiting on the model
+        column_types = self._infer_column_types(query_result)
+        heuristic_config = self._heuristic_viz_config(query_result, column_types)
+        if heuristic_config is not None:
+            if early_task is not None:
+                early_task.cancel()
+            return self._normalize_visualization_config(query_result, heuristic_config)
+
+        if early_task is not None:
+            try:
+                early = await early_task
+            except Exception as e:
+                logger.warning(f"Early visualization failed: {str(e)}")
+                early = None
+            if early is not None and early["columns"] == query_result["columns"]:
+                return early["config"]
+        return await self.determine_visualization(
+            {**query_result, "column_types": column_types}, question
+        )
+
+    async def _visualize(
+        self,
+        early_task: Optional[asyncio.Task],
+        query_result: Dict[str, Any],
+        question: str,
+        include_spec: bool = False,
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]:
+        viz_config = await self._resolve_visualization(early_task, query_result, question)
+        logger.info(f"Visualization config: {viz_config}")
+        # Chart building (pandas, optional vl-convert) is CPU-bound; keep it off the event loop
+        chart_spec, chart_image = await asyncio.to_thread(
+            self._generate_altair_chart, query_result, viz_config, include_spec
+        )
+        return viz_config, chart_spec, chart_image
+
+    @staticmethod
+    def _heuristic_viz_config(
+        data: Dict[str, Any], column_types: Dict[str, str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pick a chart from column types for the unambiguous shapes (one dimension plus
+        measures, or two measures); return None to let the model decide. Without rows
+        only date dimensions and measure pairs can be settled.
+        """
+        rows = data["data"]
+        columns = data.get("columns", [])
+        if len(columns) < 2:
+            return None
+
+        measures = [c for c in columns if column_types.get(c) in {"int", "float"}]
+        dimensions = [c for c in columns if c not in measures]
+        if len(dimensions) > 1 or not measures:
+            return None
+
+        prefix = "€" if any("EUR" in measure for measure in measures) else ""
+        config = {"split": False, "format": {"prefix": prefix, "suffix": ""}}
+
+        if not dimensions:
+            if len(measures) != 2:
+                return None
+            return {**config, "type": "scatter", "x_axis": measures[0], "y_axis": measures[1:]}
+
+        x_field = dimensions[0]
+        if column_types.get(x_field) in {"date", "datetime"}:
+            return {**config, "type": "line", "x_axis": x_field, "y_axis": measures}
+        # ISO period strings and the pie's category count are only visible in the rows
+        if not rows:
+            return None
+
+        x_values = [row[x_field] for row in rows]
+        if all(isinstance(value, str) and _ISO_PERIOD_RE.match(value) for value in x_values):
+            chart_type = "line"
+        elif len(measures) == 1 and len(set(x_values)) <= 5:
+            chart_type = "pie"
+        else:
+            chart_type = "bar"
+        return {**config, "type": chart_type, "x_axis": x_field, "y_axis": measures}
+
+    async def determine_visualization(
+        self, data: Dict[str, Any], question: str, *, coalesce: bool = True
+    ) -> Dict[str, Any]:
+        # A column/type summary is enough for picking a chart and much shorter than sample rows
+        column_types = data.get("column_types") or self._infer_column_types(data)
+
+        # Most result shapes map to a chart type directly; only ask the model when they don't
+        heuristic_config = self._heuristic_viz_config(data, column_types)
+        if heuristic_config is not None:
+            return self._normalize_visualization_config(data, heuristic_config)
+
+        row_count = len(data["data"]) if data["data"] else None
+        row_count_line = f"Row count: {row_count}" if row_count is not None else ""
         viz_prompt = f"""
         Given this question: "{question}"
-        And this data with columns: {', '.join(data['columns'])}
-        Sample data: {json.dumps(data['data'][:2])}
+        And this data with columns: {data.get('columns_csv') or ', '.join(data['columns'])}
+        Column types: {orjson.dumps(column_types).decode()}
+        {row_count_line}
 
         Determine the most appropriate visualization approach. Consider:
         - bar: for categorical comparisons
@@ -114,11 +406,19 @@ class QueryProcessor:
         }}
         """
 
+        cache_key = self._response_cache_key(
+            "llm:viz", question, data.get("columns", []), column_types, row_count
+        )
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Visualization cache hit: {cache_key}")
+            return cached
+
         try:
-            viz_response = await self.ai_provider.process_query(viz_prompt)
-            parsed_config = json.loads(viz_response.get("response", "{}"))
+            viz_response = await self.ai_provider.process_query(viz_prompt, coalesce=coalesce)
+            parsed_config = orjson.loads(viz_response.get("response", "{}"))
         except Exception:
-            parsed_config = {}
+            parsed_config = None
 
         default_config = {
             "type": "bar",
@@ -128,8 +428,51 @@ class QueryProcessor:
             "format": {"prefix": "€", "suffix": ""},
         }
 
-        merged_config = {**default_config, **parsed_config}
-        return self._normalize_visualization_config(data, merged_config)
+        merged_config = {**default_config, **(parsed_config or {})}
+        viz_config = self._normalize_visualization_config(data, merged_config)
+        # Fallback configs are not cached so the next request retries the model
+        if parsed_config is not None:
+            self.response_cache.set(cache_key, viz_config)
+        return viz_config
+
+    async def _generate_sql(
+        self, query: str, context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        cache_key = self._response_cache_key("llm:sql", query, context)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"SQL generation cache hit: {cache_key}")
+            return cached
+
+        sql_response = await self.ai_provider.process_query(
+            f"Based on this schema, generate a SQL query for: {query}. "
+            "Tables: DataSet_Monthly_Sales_and_Quota. "
+            "Return only the raw SQL query.",
+            context,
+            question=query,
+        )
+        if "error" not in sql_response and sql_response.get("response"):
+            self.response_cache.set(cache_key, sql_response)
+        return sql_response
+
+    async def _analyze_data(
+        self, query: str, query_result: Dict[str, Any], context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        sample = query_result["sample_json"]
+        cache_key = self._response_cache_key("llm:analysis", query, sample, context)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Analysis cache hit: {cache_key}")
+            return cached
+
+        analysis_response = await self.ai_provider.process_query(
+            f"Analyze this data and answer the original question: {query}\n\n"
+            f"Data: {sample}",
+            context
+        )
+        if "error" not in analysis_response:
+            self.response_cache.set(cache_key, analysis_response)
+        return analysis_response
 
     def _infer_altair_type(self, series: pd.Series) -> str:
         if pd.api.types.is_datetime64_any_dtype(series):
@@ -139,127 +482,210 @@ class QueryProcessor:
         return "N"
 
     def _select_chart_fields(
-        self, df: pd.DataFrame, viz_config: Dict[str, Any]
+        self, columns: list[str], viz_config: Dict[str, Any]
     ) -> Tuple[Optional[str], list[str]]:
-        columns = list(df.columns)
+        # Column names are strings, so non-string axes from the model can never match
+        x_axis = viz_config.get("x_axis")
+        y_axis = tuple(
+            y_field for y_field in viz_config.get("y_axis", []) if isinstance(y_field, str)
+        )
+        x_field, y_fields = self._select_chart_fields_cached(
+            tuple(columns), x_axis if isinstance(x_axis, str) else None, y_axis
+        )
+        return x_field, list(y_fields)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _select_chart_fields_cached(
+        columns: Tuple[str, ...], x_axis: Optional[str], y_axis: Tuple[str, ...]
+    ) -> Tuple[Optional[str], Tuple[str, ...]]:
         if not columns:
-            return None, []
+            return None, ()
 
-        x_field = viz_config.get("x_axis")
+        x_field = x_axis
         if x_field not in columns:
             x_field = columns[0]
 
-        requested_y = [
-            y_field for y_field in viz_config.get("y_axis", []) if y_field in columns
-        ]
+        requested_y = tuple(y_field for y_field in y_axis if y_field in columns)
         if not requested_y:
-            requested_y = [col for col in columns if col != x_field][:2]
+            requested_y = tuple(col for col in columns if col != x_field)[:2]
 
         return x_field, requested_y
 
-    def _generate_altair_chart(
-        self, df: pd.DataFrame, viz_config: Dict[str, Any]
-    ) -> Optional[str]:
-        if df.empty:
-            return None
+    def _reduce_chart_points(
+        self, chart_df: pd.DataFrame, chart_type: str, x_field: str, y_fields: list[str]
+    ) -> pd.DataFrame:
+        if chart_type == "scatter":
+            return chart_df.sample(n=self.CHART_MAX_POINTS, random_state=0)
+        value_fields = [field for field in y_fields if field != x_field]
+        if chart_type in {"bar", "line", "multiple"} and value_fields:
+            return chart_df.groupby(x_field, as_index=False, dropna=False, observed=True)[
+                value_fields
+            ].sum()
+        return chart_df
 
-        chart_df = df.copy()
-        x_field, y_fields = self._select_chart_fields(chart_df, viz_config)
+    def _generate_altair_chart(
+        self, data: Dict[str, Any], viz_config: Dict[str, Any], include_spec: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Return ``(vega_lite_spec, png_data_url)``. The frontend shows the PNG; the
+        spec embeds a copy of every plotted row, so it is only returned on request.
+        """
+        if not data.get("data"):
+            return None, None
 
+        # Pick fields from the column list so unchartable results never build a frame
+        x_field, y_fields = self._select_chart_fields(data["columns"], viz_config)
         if not x_field or not y_fields:
-            return None
+            return None, None
 
+        cache_key = self._response_cache_key("chart", data["result_key"], viz_config)
+        try:
+            spec = self.chart_cache.get(f"{cache_key}:spec") if include_spec else None
+            chart_image = self.chart_cache.get(f"{cache_key}:png")
+            if chart_image is None or (include_spec and spec is None):
+                spec = self._build_chart_spec(data, viz_config, x_field, y_fields)
+                self.chart_cache.set(f"{cache_key}:spec", spec)
+            if chart_image is None:
+                png_bytes = vlc.vegalite_to_png(spec)
+                encoded = base64.b64encode(png_bytes).decode("ascii")
+                chart_image = f"data:image/png;base64,{encoded}"
+                self.chart_cache.set(f"{cache_key}:png", chart_image)
+            return (spec if include_spec else None), chart_image
+        except Exception as exc:
+            logger.warning("Failed to generate Altair visualization: %s", exc)
+            return None, None
+
+    def _build_chart_spec(
+        self,
+        data: Dict[str, Any],
+        viz_config: Dict[str, Any],
+        x_field: str,
+        y_fields: list[str],
+    ) -> Dict[str, Any]:
+        # Only the plotted columns are materialized; other result columns never enter the frame
+        chart_df = pd.DataFrame.from_records(
+            data["data"], columns=list(dict.fromkeys([x_field, *y_fields]))
+        )
         chart_type = viz_config.get("type", "bar")
 
-        for field in y_fields:
-            if field in chart_df:
-                chart_df[field] = pd.to_numeric(chart_df[field], errors="coerce")
+        # pyodbc already decodes numeric columns; only object columns need parsing
+        object_fields = [
+            field for field in y_fields if not pd.api.types.is_numeric_dtype(chart_df[field])
+        ]
+        if object_fields:
+            chart_df[object_fields] = chart_df[object_fields].apply(
+                pd.to_numeric, errors="coerce"
+            )
 
-        x_type = self._infer_altair_type(chart_df[x_field]) if x_field in chart_df else "N"
+        # DATE columns arrive as datetime.date objects (object dtype); convert them
+        # directly instead of leaving the axis nominal or letting pandas guess a format
+        x_values = chart_df[x_field]
+        if x_values.dtype == object:
+            first = x_values.dropna().iloc[0] if x_values.notna().any() else None
+            if isinstance(first, date):
+                chart_df[x_field] = pd.to_datetime(x_values, errors="coerce", cache=True)
+
+        x_type = self._infer_altair_type(chart_df[x_field])
+
+        if len(chart_df) > self.CHART_MAX_POINTS:
+            chart_df = self._reduce_chart_points(chart_df, chart_type, x_field, y_fields)
+
+        y_type = "Q"
+        if chart_type == "pie":
+            plot_df = (
+                chart_df.groupby(x_field, dropna=False, sort=False, observed=True)[y_fields[0]]
+                .sum()
+                .reset_index()
+            )
+            y_fields = y_fields[:1]
+        elif chart_type != "scatter" and len(y_fields) > 1:
+            # stack() reshapes without replicating the id column the way melt() does
+            plot_df = (
+                chart_df.set_index(x_field)[y_fields]
+                .rename_axis(columns="Metric")
+                .stack(future_stack=True)
+                .rename("Value")
+                .reset_index()
+            )
+        else:
+            plot_df = chart_df
+            y_fields = y_fields[:1]
+            y_type = self._infer_altair_type(chart_df[y_fields[0]])
+
+        template = orjson.loads(
+            self._spec_template(chart_type, x_field, x_type, tuple(y_fields), y_type)
+        )
+        # Only the data differs per request; to_json handles NaN and timestamps like Altair does
+        return {
+            **template,
+            "data": {"values": orjson.loads(plot_df.to_json(orient="records", date_format="iso"))},
+        }
 
-        try:
-            if chart_type == "pie":
-                value_field = y_fields[0]
-                pie_df = (
-                    chart_df[[x_field, value_field]]
-                    .groupby(x_field, dropna=False)
-                    .sum(numeric_only=True)
-                    .reset_index()
-                )
-                chart = (
-                    alt.Chart(pie_df)
-                    .mark_arc()
-                    .encode(
-                        theta=alt.Theta(f"{value_field}:Q"),
-                        color=alt.Color(f"{x_field}:N", title=x_field),
-                        tooltip=[x_field, value_field],
-                    )
-                )
-            elif chart_type == "scatter":
-                y_field = y_fields[0]
-                y_type = self._infer_altair_type(chart_df[y_field])
-                chart = (
-                    alt.Chart(chart_df)
-                    .mark_circle(size=80, opacity=0.8)
-                    .encode(
-                        x=alt.X(f"{x_field}:{x_type}", title=x_field),
-                        y=alt.Y(f"{y_field}:{y_type}", title=y_field),
-                        tooltip=[x_field, y_field],
-                    )
-                )
+    @staticmethod
+    @lru_cache(maxsize=128)
+    def _spec_template(
+        chart_type: str, x_field: str, x_type: str, y_fields: Tuple[str, ...], y_type: str
+    ) -> bytes:
+        """
+        Build the Vega-Lite spec for one chart shape once, serialized so every caller
+        decodes its own copy before splicing in the data.
+        """
+        base_chart = alt.Chart(alt.Data(values=[]))
+        if chart_type == "pie":
+            value_field = y_fields[0]
+            chart = base_chart.mark_arc().encode(
+                theta=alt.Theta(f"{value_field}:Q"),
+                color=alt.Color(f"{x_field}:N", title=x_field),
+                tooltip=[f"{x_field}:N", f"{value_field}:Q"],
+            )
+        elif chart_type == "scatter":
+            y_field = y_fields[0]
+            chart = base_chart.mark_circle(size=80, opacity=0.8).encode(
+                x=alt.X(f"{x_field}:{x_type}", title=x_field),
+                y=alt.Y(f"{y_field}:{y_type}", title=y_field),
+                tooltip=[f"{x_field}:{x_type}", f"{y_field}:{y_type}"],
+            )
+        elif len(y_fields) > 1:
+            if chart_type in {"line", "multiple"}:
+                chart = base_chart.mark_line(point=True)
             else:
-                if len(y_fields) > 1:
-                    long_df = chart_df[[x_field] + y_fields].melt(
-                        id_vars=[x_field], value_vars=y_fields, var_name="Metric", value_name="Value"
-                    )
-                    base_chart = alt.Chart(long_df)
-                    if chart_type in {"line", "multiple"}:
-                        chart = base_chart.mark_line(point=True)
-                    else:
-                        chart = base_chart.mark_bar()
-                    chart = chart.encode(
-                        x=alt.X(f"{x_field}:{x_type}", title=x_field),
-                        y=alt.Y("Value:Q", title="Value"),
-                        color=alt.Color("Metric:N", title="Metric"),
-                        tooltip=[x_field, "Metric", "Value"],
-                    )
-                else:
-                    y_field = y_fields[0]
-                    y_type = self._infer_altair_type(chart_df[y_field])
-                    base_chart = alt.Chart(chart_df)
-                    if chart_type == "line":
-                        chart = base_chart.mark_line(point=True)
-                    else:
-                        chart = base_chart.mark_bar()
-                    chart = chart.encode(
-                        x=alt.X(f"{x_field}:{x_type}", title=x_field),
-                        y=alt.Y(f"{y_field}:{y_type}", title=y_field),
-                        tooltip=[x_field, y_field],
-                    )
-
-            chart = chart.properties(width=720, height=400).configure_axis(
-                labelFontSize=11, titleFontSize=12
-            ).configure_legend(labelFontSize=11, titleFontSize=12)
-
-            spec = chart.to_dict()
-            png_bytes = vlc.vegalite_to_png(spec)
-            encoded = base64.b64encode(png_bytes).decode("utf-8")
-            return f"data:image/png;base64,{encoded}"
-        except Exception as exc:
-            logger.warning("Failed to generate Altair visualization: %s", exc)
-            return None
+                chart = base_chart.mark_bar()
+            chart = chart.encode(
+                x=alt.X(f"{x_field}:{x_type}", title=x_field),
+                y=alt.Y("Value:Q", title="Value"),
+                color=alt.Color("Metric:N", title="Metric"),
+                tooltip=[f"{x_field}:{x_type}", "Metric:N", "Value:Q"],
+            )
+        else:
+            y_field = y_fields[0]
+            if chart_type == "line":
+                chart = base_chart.mark_line(point=True)
+            else:
+                chart = base_chart.mark_bar()
+            chart = chart.encode(
+                x=alt.X(f"{x_field}:{x_type}", title=x_field),
+                y=alt.Y(f"{y_field}:{y_type}", title=y_field),
+                tooltip=[f"{x_field}:{x_type}", f"{y_field}:{y_type}"],
+            )
 
-    async def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        chart = chart.properties(width=720, height=400).configure_axis(
+            labelFontSize=11, titleFontSize=12
+        ).configure_legend(labelFontSize=11, titleFontSize=12)
+        return orjson.dumps(chart.to_dict())
+
+    async def process_query(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None,
+        include_spec: bool = False,
+    ) -> Dict[str, Any]:
+        early_viz_task = None
         try:
             logger.info(f"Processing query: {query}")
             
             # Get SQL query from AI
-            sql_response = await self.ai_provider.process_query(
-                f"Based on this schema, generate a SQL query for: {query}. "
-                "Tables: DataSet_Monthly_Sales_and_Quota. "
-                "Return only the raw SQL query.",
-                context
-            )
+            sql_response = await self._generate_sql(query, context)
 
             if "error" in sql_response:
                 logger.error(f"AI provider error during SQL generation: {sql_response['error']}")
@@ -272,30 +698,42 @@ class QueryProcessor:
                 logger.error(f"Failed to generate SQL query from AI response: {raw_sql!r}")
                 return {"error": "Failed to generate a SQL query from the AI response."}
 
-            normalized = sql_query.lstrip().lower()
-            if not (normalized.startswith("select") or normalized.startswith("with")):
+            if not _SAFE_SELECT_RE.match(sql_query):
                 logger.error(f"Unexpected SQL output: {sql_query}")
                 return {"error": "Generated SQL query is not a SELECT statement. Please refine your question."}
 
+            # A trailing semicolon is fine; anything after an inner one is a second statement
+            if _INNER_SEMICOLON_RE.search(sql_query):
+                logger.error(f"Multi-statement SQL output: {sql_query}")
+                return {"error": "Generated SQL query contains multiple statements. Please refine your question."}
+
             logger.info(f"Generated SQL query: {sql_query}")
             
+            # On a cold query, pick the chart from the described columns while
+            # the query itself runs; a cached result needs no head start
+            if self.cache.get(self._sql_cache_key(sql_query)) is None:
+                early_viz_task = asyncio.create_task(
+                    self._early_visualization(sql_query, query)
+                )
+
             # Execute SQL query
-            df, query_result = await self.execute_sql_query(sql_query)
+            query_result = await self.execute_sql_query(sql_query)
             
             if "error" in query_result:
                 return query_result
 
-            # Get visualization recommendation
-            viz_config = await self.determine_visualization(query_result, query)
-            logger.info(f"Visualization config: {viz_config}")
-            chart_image = self._generate_altair_chart(df, viz_config)
-
-            # Get analysis from AI
-            analysis_response = await self.ai_provider.process_query(
-                f"Analyze this data and answer the original question: {query}\n\n"
-                f"Data: {json.dumps(query_result['data'][:5])}",
-                context
+            # Visualization and analysis only depend on the query result, so
+            # both run concurrently; the chart renders while analysis is pending
+            visualization, analysis_response = await asyncio.gather(
+                self._visualize(early_viz_task, query_result, query, include_spec),
+                self._analyze_data(query, query_result, context),
+                return_exceptions=True,
             )
+            if isinstance(visualization, BaseException):
+                raise visualization
+            if isinstance(analysis_response, BaseException):
+                analysis_response = {"error": str(analysis_response)}
+            viz_config, chart_spec, chart_image = visualization
 
             if "error" in analysis_response:
                 logger.error(f"AI provider error during analysis: {analysis_response['error']}")
@@ -305,6 +743,7 @@ class QueryProcessor:
                     "columns": query_result["columns"],
                     "sql_query": sql_query,
                     "visualization": viz_config,
+                    "chart_spec": chart_spec,
                     "chart_image": chart_image,
                     "error": analysis_response["error"],
                 }
@@ -315,9 +754,17 @@ class QueryProcessor:
                 "columns": query_result["columns"],
                 "sql_query": sql_query,
                 "visualization": viz_config,
+                "chart_spec": chart_spec,
                 "chart_image": chart_image,
             }
 
         except Exception as e:
             logger.error(f"Processing Error: {str(e)}")
             return {"error": f"Processing Error: {str(e)}"}
+        finally:
+            # Early exits and failures leave the describe + LLM task unconsumed
+            if early_viz_task is not None:
+                if not early_viz_task.done():
+                    early_viz_task.cancel()
+                elif not early_viz_task.cancelled():
+                    early_viz_task.exception()
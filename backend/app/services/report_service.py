@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 import calendar
-import logging
+from hashlib import blake2b
 import asyncio
-from typing import Any, Dict, List, Optional, Tuple
-import base64
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+try:
+    # SIMD-accelerated drop-in for the stdlib module when installed
+    import pybase64 as base64
+except ImportError:
+    import base64
+from collections import defaultdict
 from io import BytesIO
 
 import numpy as np
@@ -18,29 +24,89 @@ from statsmodels.tsa.statespace.sarimax import SARIMAX
 from pptx import Presentation
 from pptx.util import Inches, Pt
 
+from ..cache.cache_manager import CacheManager
 from ..database.connection import DatabaseConnection
 from ..ai_providers.gemini_provider import GeminiProvider
 
 logger = logging.getLogger(__name__)
 
+# Payload dates are serialized once per column rather than per row
+ISO_DATE_FORMAT = "%Y-%m-%d"
+
+# Filterable columns and their bind parameter names
+FILTER_PARAM_KEYS: Dict[str, str] = {
+    column: column.lower().replace(" ", "_")
+    for column in (
+        "Sales Organisation",
+        "Sales Country",
+        "Sales Region",
+        "Sales State",
+        "Sales City",
+        "Product Line",
+        "Product Category",
+    )
+}
+
 
 class ReportService:
-    """Business reporting utilities used by the Reports dashboard."""
+    """
+    Business reporting utilities used by the Reports dashboard.
+
+    Every query checks a connection out of ``DatabaseConnection.engine`` per call,
+    which relies on that engine's queue pool (pre-ping, 30 min recycle, warmed at
+    startup) to keep the per-query cost at a pool checkout rather than a handshake.
+    """
 
     MIN_DATA_POINTS = 24
+    # Seconds to wait for the narrative before returning the report without one
+    AI_EXPLANATION_TIMEOUT = 15
+    # vl-convert render scale. Kept at 1.0: the dashboard and the PPTX export share
+    # one cached PNG per chart, and 2.0 would double every dashboard payload (~2.2x)
+    # just to sharpen the slides
+    CHART_SCALE = 1.0
+
+    # (response key, column, filter columns it depends on, require MIN_DATA_POINTS rows)
+    FILTER_OPTIONS: Tuple[Tuple[str, str, Tuple[str, ...], bool], ...] = (
+        ("sales_organisations", "Sales Organisation", (), False),
+        ("countries", "Sales Country", ("Sales Organisation",), False),
+        ("regions", "Sales Region", ("Sales Organisation", "Sales Country"), False),
+        (
+            "states",
+            "Sales State",
+            ("Sales Organisation", "Sales Country", "Sales Region"),
+            False,
+        ),
+        (
+            "cities",
+            "Sales City",
+            ("Sales Organisation", "Sales Country", "Sales Region", "Sales State"),
+            True,
+        ),
+        ("product_lines", "Product Line", (), False),
+        ("product_categories", "Product Category", ("Product Line",), False),
+    )
 
     def __init__(
         self,
         db: DatabaseConnection,
         ai_provider: Optional[GeminiProvider] = None,
+        filter_cache: Optional[CacheManager] = None,
+        fit_cache: Optional[CacheManager] = None,
+        payload_cache: Optional[CacheManager] = None,
     ) -> None:
         self.db = db
         self.ai_provider = ai_provider
+        # Dropdown catalogs change rarely; keyed by the normalized selections
+        self.filter_cache = filter_cache or CacheManager(max_size=512, ttl=300)
+        # Fitted SARIMAX results by series digest, plus the last fit per filter set
+        self.fit_cache = fit_cache or CacheManager(max_size=64, ttl=600)
+        # Whole report payloads (charts included) for repeat and PPTX requests
+        self.payload_cache = payload_cache or CacheManager(max_size=64, ttl=120)
 
     # ------------------------------------------------------------------
     # Filter helpers
     # ------------------------------------------------------------------
-    def get_filter_options(
+    async def get_filter_options(
         self,
         *,
         sales_org: Optional[str] = None,
@@ -52,119 +118,70 @@ class ReportService:
         """
         Return dropdown options with dependencies similar to the Gradio app.
         """
-        try:
-            with self.db.engine.connect() as connection:
-                sales_orgs = self._with_all(
-                    self._fetch_unique(connection, "Sales Organisation")
-                )
-
-                countries = self._with_all(
-                    self._fetch_unique(
-                        connection,
-                        "Sales Country",
-                        filters={"Sales Organisation": sales_org},
-                    )
-                )
-
-                regions = self._with_all(
-                    self._fetch_unique(
-                        connection,
-                        "Sales Region",
-                        filters={
-                            "Sales Organisation": sales_org,
-                            "Sales Country": country,
-                        },
-                    )
-                )
-
-                states = self._with_all(
-                    self._fetch_unique(
-                        connection,
-                        "Sales State",
-                        filters={
-                            "Sales Organisation": sales_org,
-                            "Sales Country": country,
-                            "Sales Region": region,
-                        },
-                    )
-                )
-
-                cities = self._with_all(
-                    self._fetch_unique(
-                        connection,
-                        "Sales City",
-                        filters={
-                            "Sales Organisation": sales_org,
-                            "Sales Country": country,
-                            "Sales Region": region,
-                            "Sales State": state,
-                        },
-                        require_min_points=True,
-                    )
-                )
+        selected = {
+            "Sales Organisation": sales_org,
+            "Sales Country": country,
+            "Sales Region": region,
+            "Sales State": state,
+            "Product Line": product_line,
+        }
+        cache_key = "filters:" + "|".join(
+            f"{column}={self._normalize_filter(value) or ''}"
+            for column, value in selected.items()
+        )
+        cached = self.filter_cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-                product_lines = self._with_all(
-                    self._fetch_unique(connection, "Product Line")
-                )
+        try:
+            query, params = self._filter_options_query(selected)
+            async with self.db.slot(), self.db.engine.connect() as connection:
+                rows = (await connection.execute(query, params)).fetchall()
 
-                product_categories = self._with_all(
-                    self._fetch_unique(
-                        connection,
-                        "Product Category",
-                        filters={"Product Line": product_line},
-                    )
-                )
+            buckets: Dict[str, List[Any]] = defaultdict(list)
+            for kind, value in rows:
+                buckets[kind].append(value)
 
-            return {
-                "sales_organisations": sales_orgs,
-                "countries": countries,
-                "regions": regions,
-                "states": states,
-                "cities": cities,
-                "product_lines": product_lines,
-                "product_categories": product_categories,
+            options = {
+                key: self._with_all(self._clean_values(buckets[key]))
+                for key, *_ in self.FILTER_OPTIONS
             }
         except Exception as exc:
             logger.exception("Failed to load report filters")
             raise exc
 
-    def _fetch_unique(
-        self,
-        connection,
-        column: str,
-        *,
-        filters: Optional[Dict[str, Optional[str]]] = None,
-        require_min_points: bool = False,
-    ) -> List[str]:
-        clause, params = self._build_filter_clause(filters or {})
-        column_expr = f"[{column}]"
-        non_null_clause = f" AND {column_expr} IS NOT NULL"
-
-        if require_min_points:
-            query = text(
-                f"""
-                SELECT {column_expr} as value
-                FROM DataSet_Monthly_Sales_and_Quota
-                WHERE 1=1 {clause} {non_null_clause}
-                GROUP BY {column_expr}
-                HAVING COUNT(*) >= :min_points
-                ORDER BY {column_expr}
-                """
+        self.filter_cache.set(cache_key, options)
+        return options
+
+    def invalidate_filter_cache(self) -> None:
+        """Drop cached dropdown options so the next request re-reads the catalog."""
+        self.filter_cache.clear()
+
+    def _filter_options_query(
+        self, selected: Dict[str, Optional[str]]
+    ) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Build one UNION ALL statement covering every dropdown. Branches share bind
+        parameters, since a filter column carries the same value wherever it appears.
+        """
+        branches: List[str] = []
+        params: Dict[str, Any] = {"min_points": self.MIN_DATA_POINTS}
+
+        for key, column, filter_columns, require_min_points in self.FILTER_OPTIONS:
+            clause, branch_params = self._build_filter_clause(
+                {name: selected[name] for name in filter_columns}
             )
-            params["min_points"] = self.MIN_DATA_POINTS
-        else:
-            query = text(
-                f"""
-                SELECT DISTINCT {column_expr} as value
-                FROM DataSet_Monthly_Sales_and_Quota
-                WHERE 1=1 {clause} {non_null_clause}
-                ORDER BY {column_expr}
-                """
+            params.update(branch_params)
+            having = " HAVING COUNT(*) >= :min_points" if require_min_points else ""
+            branches.append(
+                f"SELECT '{key}' AS kind, CAST([{column}] AS nvarchar(400)) AS value "
+                f"FROM DataSet_Monthly_Sales_and_Quota "
+                f"WHERE [{column}] IS NOT NULL{clause} "
+                f"GROUP BY [{column}]{having}"
             )
 
-        rows = connection.execute(query, params).fetchall()
-        values = [row[0] for row in rows]
-        return self._clean_values(values)
+        statement = "\nUNION ALL\n".join(branches) + "\nORDER BY kind, value"
+        return text(statement), params
 
     def _build_filter_clause(
         self, filters: Dict[str, Optional[str]]
@@ -173,18 +190,16 @@ class ReportService:
         params: Dict[str, str] = {}
 
         for column, raw_value in filters.items():
+            # Only allowlisted columns get interpolated into [brackets]; KeyError otherwise
+            param_name = FILTER_PARAM_KEYS[column]
             value = self._normalize_filter(raw_value)
             if value is None:
                 continue
-            param_name = self._param_key(column)
             clause_parts.append(f" AND [{column}] = :{param_name}")
             params[param_name] = value
 
         return "".join(clause_parts), params
 
-    def _param_key(self, column: str) -> str:
-        return column.lower().replace(" ", "_")
-
     def _normalize_filter(self, value: Optional[str]) -> Optional[str]:
         if value is None:
             return None
@@ -196,6 +211,9 @@ class ReportService:
         return value
 
     def _clean_values(self, raw_values: List[Any]) -> List[str]:
+        # A plain loop beats pd.Series(...).str.strip().drop_duplicates() here: the
+        # lists are already GROUP BY-distinct and at most a few thousand entries,
+        # so the Series construction overhead dominates any vectorized gain
         seen = set()
         cleaned: List[str] = []
         for value in raw_values:
@@ -214,7 +232,7 @@ class ReportService:
     # ------------------------------------------------------------------
     # Forecast helpers
     # ------------------------------------------------------------------
-    def generate_forecast(
+    async def generate_forecast(
         self,
         *,
         sales_org: Optional[str] = None,
@@ -230,7 +248,7 @@ class ReportService:
         """
         Run SARIMAX forecasting and build response payload for the UI.
         """
-        return self._build_report_payload(
+        return await self._build_report_payload(
             sales_org=sales_org,
             country=country,
             region=region,
@@ -242,7 +260,7 @@ class ReportService:
             confidence_interval=confidence_interval,
         )
 
-    def generate_pptx(
+    async def generate_pptx(
         self,
         *,
         sales_org: Optional[str] = None,
@@ -254,11 +272,11 @@ class ReportService:
         product_category: Optional[str] = None,
         forecast_periods: int = 12,
         confidence_interval: float = 0.95,
-    ) -> Tuple[bytes, str]:
+    ) -> Tuple[BytesIO, str]:
         """
         Build a PowerPoint report using the same data as the JSON payload.
         """
-        payload = self._build_report_payload(
+        payload = await self._build_report_payload(
             sales_org=sales_org,
             country=country,
             region=region,
@@ -269,11 +287,11 @@ class ReportService:
             forecast_periods=forecast_periods,
             confidence_interval=confidence_interval,
         )
-        ppt_bytes = self._build_pptx_document(payload)
+        ppt_buffer = await asyncio.to_thread(self._build_pptx_document, payload)
         filename = self._build_report_filename(payload["filters"])
-        return ppt_bytes, filename
+        return ppt_buffer, filename
 
-    def _build_report_payload(
+    async def _build_report_payload(
         self,
         *,
         sales_org: Optional[str],
@@ -286,7 +304,28 @@ class ReportService:
         forecast_periods: int,
         confidence_interval: float,
     ) -> Dict[str, Any]:
-        filtered_data = self._get_filtered_data(
+        # The dashboard typically exports the PPTX right after viewing the same forecast.
+        # Keyed on normalized filters, so "All", None and padded values share an entry
+        filter_values = tuple(
+            self._normalize_filter(value)
+            for value in (
+                sales_org,
+                country,
+                region,
+                state,
+                city,
+                product_line,
+                product_category,
+            )
+        )
+        cache_key = "payload:" + repr(
+            (*filter_values, forecast_periods, confidence_interval)
+        )
+        cached = self.payload_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        historical_agg = await self._get_aggregated_timeseries(
             sales_org=sales_org,
             country=country,
             region=region,
@@ -296,90 +335,78 @@ class ReportService:
             product_category=product_category,
         )
 
-        ts = self._prepare_time_series(filtered_data)
+        data_points = int(historical_agg["Row Count"].sum())
+        ts = self._prepare_time_series(historical_agg)
         if ts.empty or len(ts) < self.MIN_DATA_POINTS:
             raise ValueError(
                 f"Need at least {self.MIN_DATA_POINTS} monthly data points for forecasting."
             )
 
-        model = SARIMAX(
-            ts,
-            order=(1, 1, 1),
-            seasonal_order=(1, 1, 1, 12),
-            enforce_stationarity=False,
-        )
-        results = model.fit(disp=False)
+        results = await self._fit_model(ts, repr(filter_values))
 
         forecast = results.get_forecast(steps=forecast_periods)
         ci = forecast.conf_int(alpha=1 - confidence_interval)
         ci.columns = ["lower", "upper"]
 
-        historical_agg = (
-            filtered_data.groupby("Calendar DueDate")
-            .agg({"Revenue EUR": "sum", "Sales Amount": "sum"})
-            .reset_index()
-            .sort_values("Calendar DueDate")
-        )
-
+        # Monthly mean over the underlying rows, recovered from the per-date sums/counts
         seasonality = (
-            filtered_data.assign(
-                Year=filtered_data["Calendar DueDate"].dt.year,
-                Month=filtered_data["Calendar DueDate"].dt.month,
+            historical_agg.assign(
+                Year=historical_agg["Calendar DueDate"].dt.year,
+                Month=historical_agg["Calendar DueDate"].dt.month,
             )
-            .groupby(["Year", "Month"])["Revenue EUR"]
-            .mean()
+            .groupby(["Year", "Month"])[["Revenue EUR", "Row Count"]]
+            .sum()
             .reset_index()
             .sort_values(["Year", "Month"])
         )
+        seasonality["Revenue EUR"] = seasonality["Revenue EUR"] / seasonality["Row Count"]
+        seasonality["label"] = [
+            calendar.month_abbr[month] for month in seasonality["Month"].tolist()
+        ]
 
+        # Pull whole columns out once instead of walking rows with iterrows()
         historical_series = [
-            {
-                "date": row["Calendar DueDate"].date().isoformat(),
-                "revenue": float(row["Revenue EUR"]),
-                "sales_amount": float(row["Sales Amount"]),
-            }
-            for _, row in historical_agg.iterrows()
+            {"date": date, "revenue": revenue, "sales_amount": sales_amount}
+            for date, revenue, sales_amount in zip(
+                historical_agg["Calendar DueDate"].dt.strftime(ISO_DATE_FORMAT).tolist(),
+                historical_agg["Revenue EUR"].to_numpy(dtype=np.float64).tolist(),
+                historical_agg["Sales Amount"].to_numpy(dtype=np.float64).tolist(),
+            )
         ]
 
+        predicted_mean = forecast.predicted_mean
         forecast_series = [
-            {
-                "date": idx.date().isoformat(),
-                "forecast": float(value),
-                "lower": float(ci.loc[idx, "lower"]),
-                "upper": float(ci.loc[idx, "upper"]),
-            }
-            for idx, value in forecast.predicted_mean.items()
+            {"date": date, "forecast": value, "lower": lower, "upper": upper}
+            for date, value, lower, upper in zip(
+                predicted_mean.index.strftime(ISO_DATE_FORMAT).tolist(),
+                predicted_mean.to_numpy(dtype=np.float64).tolist(),
+                ci["lower"].to_numpy(dtype=np.float64).tolist(),
+                ci["upper"].to_numpy(dtype=np.float64).tolist(),
+            )
         ]
 
         seasonality_series = [
-            {
-                "year": int(row["Year"]),
-                "month": int(row["Month"]),
-                "label": calendar.month_abbr[int(row["Month"])],
-                "revenue": float(row["Revenue EUR"]),
-            }
-            for _, row in seasonality.iterrows()
+            {"year": year, "month": month, "label": label, "revenue": revenue}
+            for year, month, label, revenue in zip(
+                seasonality["Year"].to_numpy(dtype=np.int64).tolist(),
+                seasonality["Month"].to_numpy(dtype=np.int64).tolist(),
+                seasonality["label"].tolist(),
+                seasonality["Revenue EUR"].to_numpy(dtype=np.float64).tolist(),
+            )
         ]
 
-        table_rows = [
-            {
-                "date": entry["date"],
-                "forecast": entry["forecast"],
-                "lower": entry["lower"],
-                "upper": entry["upper"],
-            }
-            for entry in forecast_series
-        ]
+        # Same keys as forecast_series; both are only read after this point
+        table_rows = forecast_series
 
-        residuals = results.resid
-        non_zero_mask = (ts != 0) & (~residuals.isna())
+        ts_values = ts.to_numpy(dtype=np.float64)
+        residuals = np.asarray(results.resid, dtype=np.float64)
+        non_zero_mask = (ts_values != 0) & ~np.isnan(residuals)
         if non_zero_mask.any():
-            mape = float(
-                np.mean(
-                    np.abs(residuals[non_zero_mask] / ts[non_zero_mask])
-                )
-                * 100
-            )
+            # One pass into a preallocated buffer instead of two masked copies
+            ratios = np.zeros_like(ts_values)
+            np.divide(residuals, ts_values, out=ratios, where=non_zero_mask)
+            np.abs(ratios, out=ratios)
+            mape = float(ratios[non_zero_mask].mean() * 100)
         else:
             mape = None
 
@@ -399,7 +426,7 @@ class ReportService:
             "Applied Filters:",
             *[f"- {key}: {value}" for key, value in filters_used.items()],
             "",
-            f"Data Points Analyzed: {len(filtered_data)}",
+            f"Data Points Analyzed: {data_points}",
             f"Forecast Periods: {forecast_periods}",
             f"Confidence Interval: {confidence_interval * 100:.0f}%",
             (
@@ -417,15 +444,8 @@ class ReportService:
 
         summary = "\n".join(line for line in summary_lines if line != "")
 
-        charts = self._build_charts(
-            historical_df=historical_agg,
-            forecast_series=forecast_series,
-            historical_series=historical_series,
-            seasonality_series=seasonality_series,
-        )
-
         metrics_payload = {
-            "data_points": len(filtered_data),
+            "data_points": data_points,
             "forecast_periods": forecast_periods,
             "confidence_interval": confidence_interval,
             "mape": round(mape, 2) if mape is not None else None,
@@ -435,14 +455,24 @@ class ReportService:
             else None,
         }
 
-        explanation = self._build_ai_explanation(
-            summary=summary,
-            filters=filters_used,
-            metrics=metrics_payload,
-            forecast_series=forecast_series,
+        # Charts take the typed frames directly rather than re-parsing the JSON series
+        forecast_df = ci.assign(Value=predicted_mean).rename_axis("date").reset_index()
+        # The LLM round-trip only needs the summary, so it overlaps the chart renders
+        charts, explanation = await asyncio.gather(
+            self._build_charts(
+                historical_df=historical_agg,
+                forecast_df=forecast_df,
+                seasonality_df=seasonality,
+            ),
+            self._build_ai_explanation(
+                summary=summary,
+                filters=filters_used,
+                metrics=metrics_payload,
+                forecast_series=forecast_series,
+            ),
         )
 
-        return {
+        payload = {
             "summary": summary,
             "filters": filters_used,
             "metrics": metrics_payload,
@@ -453,8 +483,56 @@ class ReportService:
             "charts": charts,
             "explanation": explanation,
         }
+        self.payload_cache.set(cache_key, payload)
+        return payload
+
+    async def _fit_model(self, ts: pd.Series, series_key: str):
+        """
+        Fit SARIMAX once per distinct series; forecasts with other horizons or
+        intervals and the PPTX export reuse the fitted results. When the series
+        for ``series_key`` only gained months since its last fit, the stored
+        results are extended with a Kalman pass over the new tail instead.
+        """
+        digest = blake2b(ts.to_numpy(dtype=np.float64).tobytes(), digest_size=16)
+        digest.update(ts.index[0].isoformat().encode("utf-8"))
+        cache_key = f"sarimax:{digest.hexdigest()}"
+
+        results = self.fit_cache.get(cache_key)
+        if results is not None:
+            return results
+
+        state_key = f"sarimax-state:{series_key}"
+        state = self.fit_cache.get(state_key)
+        if state is not None and self._extends(ts, state[1]):
+            previous_results, fitted_ts = state
+            results = await asyncio.to_thread(
+                previous_results.append, ts.iloc[len(fitted_ts):], refit=False
+            )
+        else:
+            model = SARIMAX(
+                ts,
+                order=(1, 1, 1),
+                seasonal_order=(1, 1, 1, 12),
+                enforce_stationarity=False,
+            )
+            results = await asyncio.to_thread(model.fit, disp=False)
+
+        self.fit_cache.set(cache_key, results)
+        self.fit_cache.set(state_key, (results, ts))
+        return results
+
+    @staticmethod
+    def _extends(ts: pd.Series, fitted_ts: pd.Series) -> bool:
+        # Only new tail months are allowed; any revised history needs a refit
+        return (
+            len(ts) > len(fitted_ts)
+            and ts.index[0] == fitted_ts.index[0]
+            and np.array_equal(
+                ts.to_numpy()[: len(fitted_ts)], fitted_ts.to_numpy()
+            )
+        )
 
-    def _get_filtered_data(
+    async def _get_aggregated_timeseries(
         self,
         *,
         sales_org: Optional[str] = None,
@@ -465,20 +543,18 @@ class ReportService:
         product_line: Optional[str] = None,
         product_category: Optional[str] = None,
     ) -> pd.DataFrame:
+        """
+        Return per-date revenue/sales sums and the number of matching rows behind them,
+        aggregated by MSSQL so only one row per date crosses the wire.
+        """
         query = """
-            SELECT 
+            SELECT
                 [Calendar DueDate],
-                [Revenue EUR],
-                [Sales Amount],
-                [Sales Organisation],
-                [Sales Country],
-                [Sales Region],
-                [Sales State],
-                [Sales City],
-                [Product Line],
-                [Product Category]
+                COALESCE(SUM([Revenue EUR]), 0) AS [Revenue EUR],
+                COALESCE(SUM([Sales Amount]), 0) AS [Sales Amount],
+                COUNT(*) AS [Row Count]
             FROM DataSet_Monthly_Sales_and_Quota
-            WHERE 1=1
+            WHERE [Calendar DueDate] IS NOT NULL
         """
 
         clause, params = self._build_filter_clause(
@@ -493,29 +569,38 @@ class ReportService:
             }
         )
 
-        query = query + clause + " ORDER BY [Calendar DueDate]"
+        query = (
+            query
+            + clause
+            + " GROUP BY [Calendar DueDate] ORDER BY [Calendar DueDate]"
+        )
+
+        # Only the fetch holds a DB slot; fitting and the LLM narrative run outside it
+        async with self.db.slot(), self.db.engine.connect() as connection:
+            result = await connection.execute(text(query), params)
+            rows = result.all()
+            columns = list(result.keys())
 
-        with self.db.engine.connect() as connection:
-            df = pd.read_sql_query(text(query), connection, params=params)
+        df = pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
 
         if df.empty:
             raise ValueError("No data found for the selected filters.")
 
-        if len(df) < self.MIN_DATA_POINTS:
+        row_count = int(df["Row Count"].sum())
+        if row_count < self.MIN_DATA_POINTS:
             raise ValueError(
-                f"Insufficient data for forecast. Found only {len(df)} rows but "
+                f"Insufficient data for forecast. Found only {row_count} rows but "
                 f"at least {self.MIN_DATA_POINTS} are required."
             )
 
-        df["Calendar DueDate"] = pd.to_datetime(df["Calendar DueDate"])
+        # datetime values arrive as datetime64 already; only date/str columns need parsing
+        if not pd.api.types.is_datetime64_any_dtype(df["Calendar DueDate"]):
+            df["Calendar DueDate"] = pd.to_datetime(df["Calendar DueDate"])
         return df
 
     def _prepare_time_series(self, df: pd.DataFrame) -> pd.Series:
-        series = (
-            df.groupby("Calendar DueDate")["Revenue EUR"]
-            .sum()
-            .sort_index()
-        )
+        # Already one row per date, sorted by the query
+        series = df.set_index("Calendar DueDate")["Revenue EUR"]
         if series.empty:
             return series
 
@@ -524,39 +609,43 @@ class ReportService:
             end=series.index.max(),
             freq="M",
         )
-        series = series.reindex(date_range, fill_value=0)
+        # statsmodels runs the Kalman filter in float64 whatever the input dtype,
+        # so hand it float64 directly instead of a narrower copy it would upcast
+        series = series.reindex(date_range, fill_value=0).astype(np.float64, copy=False)
         return series
 
     # ------------------------------------------------------------------
     # Chart helpers
     # ------------------------------------------------------------------
-    def _build_charts(
+    async def _build_charts(
         self,
         *,
         historical_df: pd.DataFrame,
-        forecast_series: List[Dict[str, Any]],
-        historical_series: List[Dict[str, Any]],
-        seasonality_series: List[Dict[str, Any]],
+        forecast_df: pd.DataFrame,
+        seasonality_df: pd.DataFrame,
     ) -> Dict[str, Optional[str]]:
         try:
-            return {
-                "historical": self._chart_to_data_url(
-                    self._historical_chart(historical_df)
+            # Independent renders; one chart's spec is built while another rasterizes
+            historical, forecast, seasonal = await asyncio.gather(
+                asyncio.to_thread(self._render_chart, self._historical_chart, historical_df),
+                asyncio.to_thread(
+                    self._render_chart, self._forecast_chart, historical_df, forecast_df
                 ),
-                "forecast": self._chart_to_data_url(
-                    self._forecast_chart(historical_series, forecast_series)
+                asyncio.to_thread(
+                    self._render_chart, self._seasonality_chart, seasonality_df
                 ),
-                "seasonal": self._chart_to_data_url(
-                    self._seasonality_chart(seasonality_series)
-                ),
-            }
+            )
+            return {"historical": historical, "forecast": forecast, "seasonal": seasonal}
         except Exception as exc:
             logger.warning("Failed to build charts: %s", exc)
             return {"historical": None, "forecast": None, "seasonal": None}
 
+    def _render_chart(self, build: Callable[..., alt.Chart], *args: Any) -> str:
+        return self._chart_to_data_url(build(*args))
+
     def _chart_to_data_url(self, chart: alt.Chart) -> str:
-        png_bytes = vegalite_to_png(chart.to_dict())
-        encoded = base64.b64encode(png_bytes).decode("utf-8")
+        png_bytes = vegalite_to_png(chart.to_dict(), scale=self.CHART_SCALE)
+        encoded = base64.b64encode(png_bytes).decode("ascii")
         return f"data:image/png;base64,{encoded}"
 
     def _historical_chart(self, historical_df: pd.DataFrame) -> alt.Chart:
@@ -581,7 +670,7 @@ class ReportService:
         )
         return chart
 
-    def _build_pptx_document(self, payload: Dict[str, Any]) -> bytes:
+    def _build_pptx_document(self, payload: Dict[str, Any]) -> BytesIO:
         prs = Presentation()
 
         # Title slide
@@ -666,19 +755,28 @@ class ReportService:
                 rows, cols, Inches(0.5), Inches(1.5), Inches(9), Inches(3.5)
             ).table
             headers = ["Date", "Forecast", "Lower", "Upper"]
-            for idx, header in enumerate(headers):
-                cell = table.cell(0, idx)
+            formatted_rows = [
+                (
+                    row["date"],
+                    f"{row['forecast']:,.0f}",
+                    f"{row['lower']:,.0f}",
+                    f"{row['upper']:,.0f}",
+                )
+                for row in forecast_rows
+            ]
+            # Walk rows/cells once; table.cell(r, c) re-runs an XPath lookup per call
+            table_rows = iter(table.rows)
+            for cell, header in zip(next(table_rows).cells, headers):
                 cell.text = header
                 cell.text_frame.paragraphs[0].font.bold = True
-            for row_idx, row in enumerate(forecast_rows, start=1):
-                table.cell(row_idx, 0).text = row["date"]
-                table.cell(row_idx, 1).text = f"{row['forecast']:,.0f}"
-                table.cell(row_idx, 2).text = f"{row['lower']:,.0f}"
-                table.cell(row_idx, 3).text = f"{row['upper']:,.0f}"
+            for table_row, values in zip(table_rows, formatted_rows):
+                for cell, value in zip(table_row.cells, values):
+                    cell.text = value
 
         output = BytesIO()
         prs.save(output)
-        return output.getvalue()
+        output.seek(0)
+        return output
 
     def _decode_data_url(self, data_url: str) -> bytes:
         if "," in data_url:
@@ -692,29 +790,29 @@ class ReportService:
 
     def _forecast_chart(
         self,
-        historical_series: List[Dict[str, Any]],
-        forecast_series: List[Dict[str, Any]],
+        historical_df: pd.DataFrame,
+        forecast_df: pd.DataFrame,
     ) -> alt.Chart:
-        hist_df = pd.DataFrame(historical_series)
-        hist_df["Type"] = "Historical"
-        hist_df.rename(columns={"revenue": "Value"}, inplace=True)
-        hist_df = hist_df[["date", "Value", "Type"]]
-
-        forecast_df = pd.DataFrame(forecast_series)
-        if forecast_df.empty:
-            forecast_df = pd.DataFrame(
-                {"date": [], "Value": [], "Type": [], "lower": [], "upper": []}
-            )
-        else:
-            forecast_df = forecast_df.rename(columns={"forecast": "Value"})
-            forecast_df["Type"] = "Forecast"
-
-        combined = pd.concat([hist_df, forecast_df], ignore_index=True)
-        combined["date"] = pd.to_datetime(combined["date"])
-
-        ci_df = pd.DataFrame(forecast_series)
-        if not ci_df.empty:
-            ci_df["date"] = pd.to_datetime(ci_df["date"])
+        # Both date columns are already datetime64, so the columns concatenate as-is
+        combined = pd.DataFrame(
+            {
+                "date": np.concatenate(
+                    [
+                        historical_df["Calendar DueDate"].to_numpy(),
+                        forecast_df["date"].to_numpy(),
+                    ]
+                ),
+                "Value": np.concatenate(
+                    [
+                        historical_df["Revenue EUR"].to_numpy(dtype=np.float64),
+                        forecast_df["Value"].to_numpy(dtype=np.float64),
+                    ]
+                ),
+                "Type": np.repeat(
+                    ["Historical", "Forecast"], [len(historical_df), len(forecast_df)]
+                ),
+            }
+        )
 
         line_chart = (
             alt.Chart(combined)
@@ -726,11 +824,11 @@ class ReportService:
             )
         )
 
-        if ci_df.empty:
+        if forecast_df.empty:
             return line_chart.properties(width=500, height=300, title="Forecast")
 
         band = (
-            alt.Chart(ci_df)
+            alt.Chart(forecast_df[["date", "lower", "upper"]])
             .mark_area(opacity=0.2)
             .encode(
                 x="date:T",
@@ -741,25 +839,20 @@ class ReportService:
 
         return (band + line_chart).properties(width=500, height=300, title="Forecast")
 
-    def _seasonality_chart(
-        self, seasonality_series: List[Dict[str, Any]]
-    ) -> alt.Chart:
-        df = pd.DataFrame(seasonality_series)
-        if df.empty:
-            df = pd.DataFrame({"label": [], "revenue": [], "year": []})
+    def _seasonality_chart(self, seasonality_df: pd.DataFrame) -> alt.Chart:
         chart = (
-            alt.Chart(df)
+            alt.Chart(seasonality_df[["label", "Revenue EUR", "Year"]])
             .mark_line()
             .encode(
                 x=alt.X("label:N", title="Month"),
-                y=alt.Y("revenue:Q", title="Average Revenue (EUR)"),
-                color=alt.Color("year:N", title="Year"),
+                y=alt.Y("Revenue EUR:Q", title="Average Revenue (EUR)"),
+                color=alt.Color("Year:N", title="Year"),
             )
             .properties(width=500, height=300, title="Seasonal Patterns")
         )
         return chart
 
-    def _build_ai_explanation(
+    async def _build_ai_explanation(
         self,
         *,
         summary: str,
@@ -784,7 +877,10 @@ class ReportService:
         )
 
         try:
-            text = asyncio.run(self.ai_provider.generate_analysis(prompt))
+            text = await asyncio.wait_for(
+                self.ai_provider.generate_analysis(prompt),
+                timeout=self.AI_EXPLANATION_TIMEOUT,
+            )
             return text.strip()
         except Exception as exc:
             logger.warning("Gemini explanation failed: %s", exc)